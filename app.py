@@ -3,14 +3,12 @@ from dotenv import load_dotenv
 import os
 import datetime
 import json
-import openai
-# Fix imports - import whole modules instead of specific classes that don't exist
-import arxiv_scraper
-import techcrunch
-import theverge
-import thn
-import venture_beat
-import stanford_ai
+# Scraper, spaCy und OpenAI-Client werden erst beim ersten Gebrauch geladen (providers.py)
+import llm
+import llm_router
+import ingestion
+import dedup
+from article import to_dicts
 from relevance import analyze_relevance
 from cache_utils import save_to_cache, get_cached_data
 
@@ -24,10 +22,9 @@ app.secret_key = os.environ.get('FLASK_SECRET_KEY', os.urandom(24).hex())
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 ARXIV_API_KEY = os.environ.get('ARXIV_API_KEY')  # If applicable
 
-# Initialize OpenAI client with the API key
-openai.api_key = OPENAI_API_KEY
-
 # We don't need to initialize scrapers here - we'll call their main functions directly
+# Chat context: how many matching articles to take per source
+CHAT_SOURCE_LIMITS = [('arxiv', 5), ('techcrunch', 3), ('theverge', 3), ('thehackernews', 3), ('venturebeat', 3), ('stanford', 3)]
 
 # Utility functions
 def now(format="%Y-%m-%d %H:%M:%S"):
@@ -71,7 +68,7 @@ def chat():
     # Get user preferences
     preferences = {
         'api_key_set': bool(OPENAI_API_KEY),
-        'model': 'gpt-3.5-turbo'
+        'model': llm_router.select('chat')
     }
     
     return render_template('chat.html', chat_history=session.get('chat_history', []), preferences=preferences)
@@ -89,7 +86,7 @@ def api_chat():
         # Get request data
         data = request.get_json()
         query = data.get('query', '')
-        model = data.get('model', 'gpt-3.5-turbo')
+        model = data.get('model')
         
         if not query:
             return jsonify({
@@ -117,88 +114,17 @@ def api_chat():
         if cached_result:
             sources = cached_result
         else:
-            # Query all data sources
-            # Update this section to use the correct function calls
-            try:
-                # Get arxiv results - assume search functionality is available
-                if hasattr(arxiv_scraper, 'search_arxiv'):
-                    arxiv_results = arxiv_scraper.search_arxiv(query, max_results=5)
-                else:
-                    # Fall back to main function and filter results
-                    all_arxiv = arxiv_scraper.main_arxiv()
-                    arxiv_results = [
-                        {"title": title, "content": data["summary"], "url": data["link"], "date": data["published"]} 
-                        for title, data in all_arxiv.items() 
-                        if query.lower() in title.lower() or query.lower() in data["summary"].lower()
-                    ][:5]
-                sources.extend(arxiv_results)
-            except Exception as e:
-                app.logger.error(f"Error querying ArXiv: {str(e)}")
-            
-            try:
-                # Get TechCrunch results
-                tech_results = techcrunch.main_techcrunch()
-                # Filter by query
-                filtered_tech = [
-                    {"title": item[0], "content": item[2], "url": item[1], "date": "Recent"} 
-                    for item in tech_results 
-                    if query.lower() in item[0].lower() or query.lower() in item[2].lower()
-                ][:3]
-                sources.extend(filtered_tech)
-            except Exception as e:
-                app.logger.error(f"Error querying TechCrunch: {str(e)}")
-            
-            try:
-                # Get The Verge results
-                verge_results = theverge.main_verge()
-                # Filter by query
-                filtered_verge = [
-                    {"title": item[0], "content": item[2], "url": item[1], "date": "Recent"} 
-                    for item in verge_results 
-                    if query.lower() in item[0].lower() or query.lower() in item[2].lower()
-                ][:3]
-                sources.extend(filtered_verge)
-            except Exception as e:
-                app.logger.error(f"Error querying The Verge: {str(e)}")
-            
-            try:
-                # Get The Hacker News results
-                thn_results = thn.main_thn()
-                # Filter by query
-                filtered_thn = [
-                    {"title": item[0], "content": item[2], "url": item[1], "date": "Recent"} 
-                    for item in thn_results 
-                    if query.lower() in item[0].lower() or query.lower() in item[2].lower()
-                ][:3]
-                sources.extend(filtered_thn)
-            except Exception as e:
-                app.logger.error(f"Error querying THN: {str(e)}")
-            
-            try:
-                # Get VentureBeat results
-                vb_results = venture_beat.main_venturebeat()
-                # Filter by query
-                filtered_vb = [
-                    {"title": item[0], "content": item[2], "url": item[1], "date": "Recent"} 
-                    for item in vb_results 
-                    if query.lower() in item[0].lower() or query.lower() in item[2].lower()
-                ][:3]
-                sources.extend(filtered_vb)
-            except Exception as e:
-                app.logger.error(f"Error querying VentureBeat: {str(e)}")
-            
-            try:
-                # Get Stanford AI results
-                stanford_results = stanford_ai.main_stanford()
-                # Filter by query
-                filtered_stanford = [
-                    {"title": item[0], "content": item[2], "url": item[1], "date": "Recent"} 
-                    for item in stanford_results 
-                    if query.lower() in item[0].lower() or query.lower() in item[2].lower()
-                ][:3]
-                sources.extend(filtered_stanford)
-            except Exception as e:
-                app.logger.error(f"Error querying Stanford AI: {str(e)}")
+            # Query all data sources and keep the articles matching the query
+            query_lower = query.lower()
+            for source_name, limit in CHAT_SOURCE_LIMITS:
+                try:
+                    articles = ingestion.SOURCE_RUNNERS[source_name]({}) or []
+                    sources.extend([
+                        article for article in articles
+                        if query_lower in article.title.lower() or query_lower in article.summary.lower()
+                    ][:limit])
+                except Exception as e:
+                    app.logger.error(f"Error querying {source_name}: {str(e)}")
             
             # Sort by relevance if calculate_relevance is implemented correctly
             try:
@@ -212,10 +138,10 @@ def api_chat():
         # Format sources for the AI prompt
         formatted_sources = ""
         for idx, source in enumerate(sources[:10]):  # Limit to top 10 most relevant
-            title = source.get('title', 'Unknown Title')
-            content = source.get('content', 'No content available')
-            url = source.get('url', '#')
-            date = source.get('date', 'Unknown date')
+            title = source.title or 'Unknown Title'
+            content = source.summary or 'No content available'
+            url = source.link or '#'
+            date = source.date or 'Unknown date'
             
             # Truncate content if too long
             if len(content) > 1000:
@@ -249,11 +175,9 @@ def api_chat():
         # Generate response from OpenAI
         try:
             # Verwende moderne OpenAI API-Syntax
-            from openai import OpenAI
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            
-            response = client.chat.completions.create(
+            response = llm.chat(
                 model=model,
+                task='chat',
                 messages=conversation,
                 temperature=0.7,
                 max_tokens=500
@@ -262,8 +186,10 @@ def api_chat():
             ai_response = response.choices[0].message.content
         except AttributeError:
             # Fallback für ältere OpenAI API-Versionen
+            import openai
+            openai.api_key = OPENAI_API_KEY
             response = openai.ChatCompletion.create(
-                model=model,
+                model=model or llm_router.select('chat'),
                 messages=conversation,
                 temperature=0.7,
                 max_tokens=500
@@ -298,7 +224,7 @@ def settings():
     # Get current settings
     settings = {
         'api_key_set': bool(OPENAI_API_KEY),
-        'model': 'gpt-3.5-turbo'
+        'model': llm_router.select('chat')
     }
     return render_template('settings.html', settings=settings)
 
@@ -324,67 +250,13 @@ def fetch_data():
                 'message': 'No sources selected.'
             }), 400
 
-        # Placeholder for fetched data
-        fetched_data = {}
-
-        # Fetch data from each selected source
-        if 'arxiv' in sources:
-            try:
-                fetched_data['arxiv'] = arxiv_scraper.main_arxiv(categories=[arxiv_category], max_results=max_articles, citation_styles=citation_styles)
-                app.logger.info(f"ArXiv data structure: {type(fetched_data['arxiv'])}")
-            except Exception as e:
-                app.logger.error(f"Error fetching ArXiv data: {str(e)}")
-                fetched_data['arxiv'] = {}
-
-        if 'techcrunch' in sources:
-            try:
-                tech_results = techcrunch.main_techcrunch()
-                if tech_results:
-                    fetched_data['techcrunch'] = tech_results[:max_articles]
-                app.logger.info(f"TechCrunch data structure: {type(fetched_data['techcrunch'])}")
-            except Exception as e:
-                app.logger.error(f"Error fetching TechCrunch data: {str(e)}")
-                fetched_data['techcrunch'] = []
-
-        if 'venturebeat' in sources:
-            try:
-                vb_results = venture_beat.main_venturebeat()
-                if vb_results:
-                    fetched_data['venturebeat'] = vb_results[:max_articles]
-                app.logger.info(f"VentureBeat data structure: {type(fetched_data['venturebeat'])}")
-            except Exception as e:
-                app.logger.error(f"Error fetching VentureBeat data: {str(e)}")
-                fetched_data['venturebeat'] = []
-
-        if 'stanford' in sources:
-            try:
-                stanford_results = stanford_ai.main_stanford()
-                if stanford_results:
-                    fetched_data['stanford'] = stanford_results[:max_articles]
-                app.logger.info(f"Stanford data structure: {type(fetched_data['stanford'])}")
-            except Exception as e:
-                app.logger.error(f"Error fetching Stanford AI data: {str(e)}")
-                fetched_data['stanford'] = []
-
-        if 'theverge' in sources:
-            try:
-                verge_results = theverge.main_verge()
-                if verge_results:
-                    fetched_data['theverge'] = verge_results[:max_articles]
-                app.logger.info(f"TheVerge data structure: {type(fetched_data['theverge'])}")
-            except Exception as e:
-                app.logger.error(f"Error fetching The Verge data: {str(e)}")
-                fetched_data['theverge'] = []
-
-        if 'thehackernews' in sources:
-            try:
-                thn_results = thn.main_thn()
-                if thn_results:
-                    fetched_data['thehackernews'] = thn_results[:max_articles]
-                app.logger.info(f"THN data structure: {type(fetched_data['thehackernews'])}")
-            except Exception as e:
-                app.logger.error(f"Error fetching THN data: {str(e)}")
-                fetched_data['thehackernews'] = []
+        # Fetch data from all selected sources concurrently
+        results = ingestion.run_sources(sources, {
+            'arxiv_categories': [arxiv_category],
+            'max_results': max_articles,
+            'citation_styles': citation_styles
+        })
+        fetched_data = {name: to_dicts(articles) for name, articles in ingestion.collect_data(results).items()}
 
         # Log the fetched data for debugging
         app.logger.info(f"Fetched data: {json.dumps(fetched_data, indent=2)}")
@@ -392,7 +264,8 @@ def fetch_data():
         # Return the fetched data
         return jsonify({
             'success': True,
-            'data': fetched_data
+            'data': fetched_data,
+            'sourceStatus': ingestion.summarize_results(results)
         })
 
     except Exception as e:
@@ -416,8 +289,7 @@ def get_dashboard_data():
             sources_to_fetch = data.get('sources', [])
             
             # Validate sources to fetch
-            valid_sources = ['arxiv', 'techcrunch', 'venturebeat', 'stanford', 'theverge', 'thehackernews']
-            sources_to_fetch = [s for s in sources_to_fetch if s in valid_sources]
+            sources_to_fetch = [s for s in sources_to_fetch if s in ingestion.SOURCE_NAMES]
             
             # If no valid sources provided, return empty data
             if not sources_to_fetch:
@@ -458,118 +330,26 @@ def get_dashboard_data():
                 'fromCache': True
             })
         
-        # If no cached data, fetch fresh data
-        all_data = {}
-        
-        # Fetch data from each selected source
-        if 'arxiv' in sources_to_fetch:
-            try:
-                all_data['arxiv'] = arxiv_scraper.main_arxiv(categories=['cs.AI', 'cs.LG'], max_results=max_results)
-            except Exception as e:
-                app.logger.error(f"Error fetching ArXiv data: {str(e)}")
-            
-        if 'techcrunch' in sources_to_fetch:
-            try:
-                tech_results = techcrunch.main_techcrunch()
-                if tech_results:
-                    all_data['techcrunch'] = tech_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching TechCrunch data: {str(e)}")
-            
-        if 'theverge' in sources_to_fetch:
-            try:
-                verge_results = theverge.main_verge()
-                if verge_results:
-                    all_data['theverge'] = verge_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching The Verge data: {str(e)}")
+        # If no cached data, fetch fresh data from all selected sources concurrently
+        results = ingestion.run_sources(sources_to_fetch, {
+            'arxiv_categories': ['cs.AI', 'cs.LG'],
+            'max_results': max_results
+        })
+        all_data = ingestion.collect_data(results, empty_on_error=False)
         
-        if 'thehackernews' in sources_to_fetch:
-            try:
-                thn_results = thn.main_thn()
-                if thn_results:
-                    all_data['thehackernews'] = thn_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching THN data: {str(e)}")
-            
-        if 'venturebeat' in sources_to_fetch:
-            try:
-                vb_results = venture_beat.main_venturebeat()
-                if vb_results:
-                    all_data['venturebeat'] = vb_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching VentureBeat data: {str(e)}")
-            
-        if 'stanford' in sources_to_fetch:
-            try:
-                stanford_results = stanford_ai.main_stanford()
-                if stanford_results:
-                    all_data['stanford'] = stanford_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching Stanford AI data: {str(e)}")
-        
-        # Extract keywords for visualization
-        keywords = {}
-        sources_count = {}
-        dates_count = {}
-        
-        # Process ArXiv data for keywords
-        if 'arxiv' in all_data and all_data['arxiv']:
-            sources_count['ArXiv'] = len(all_data['arxiv'])
-            for title, article_data in all_data['arxiv'].items():
-                # Process date
-                pub_date = article_data.get('published', '')
-                if pub_date:
-                    date_str = pub_date[:10] if isinstance(pub_date, str) else pub_date.strftime('%Y-%m-%d')
-                    dates_count[date_str] = dates_count.get(date_str, 0) + 1
-                
-                # Extract keywords from title and summary
-                for keyword in extract_keywords(title + " " + article_data.get('summary', '')):
-                    keywords[keyword] = keywords.get(keyword, 0) + 1
-                    
-        # Process other sources
-        for source_name, articles in all_data.items():
-            if source_name != 'arxiv' and articles:
-                sources_count[source_name.capitalize()] = len(articles)
-                for article in articles:
-                    if isinstance(article, list) and len(article) >= 3:
-                        title = article[0]
-                        content = article[2]
-                        for keyword in extract_keywords(title + " " + content):
-                            keywords[keyword] = keywords.get(keyword, 0) + 1
+        # Extract keywords, per-source counts and dates
+        keywords, sources_count, dates_count = article_stats(all_data)
         
         # Prepare flattened recentArticles list
-        recent_articles_list = []
-        # Process ArXiv articles
-        if 'arxiv' in all_data and isinstance(all_data['arxiv'], dict):
-            for title, art in all_data['arxiv'].items():
-                recent_articles_list.append({
-                    'title': title,
-                    'summary': art.get('summary', ''),
-                    'source': 'arxiv',
-                    'url': art.get('link', '#'),
-                    'date': art.get('published', ''),
-                    'relevance': 0
-                })
-        # Process other sources (list of [title, link, summary])
-        for src in sources_to_fetch:
-            if src != 'arxiv' and src in all_data and isinstance(all_data[src], list):
-                for art in all_data[src]:
-                    title = art[0] if len(art) > 0 else ''
-                    url = art[1] if len(art) > 1 else '#'
-                    summary = art[2] if len(art) > 2 else ''
-                    date = art[3] if len(art) > 3 else ''
-                    recent_articles_list.append({
-                        'title': title,
-                        'summary': summary,
-                        'source': src,
-                        'url': url,
-                        'date': date,
-                        'relevance': 0
-                    })
-        
-        # Limit to 20 articles
-        limited_articles = recent_articles_list[:20]
+        recent_articles_list = [
+            {'title': art.title, 'summary': art.summary, 'source': art.source,
+             'url': art.link or '#', 'date': art.date, 'relevance': art.relevance_score}
+            for src in sources_to_fetch
+            for art in all_data.get(src, [])
+        ]
+        
+        # Limit to 20 articles, with other sources covering the same story
+        limited_articles = dedup.add_related(recent_articles_list[:20], 'url')
         
         # Prepare topKeywords and trendingTopics
         sorted_keywords = sorted(keywords.items(), key=lambda x: x[1], reverse=True)
@@ -612,8 +392,7 @@ def refresh_dashboard_cache():
         sources_to_fetch = data.get('sources', [])
         
         # Validate sources to fetch
-        valid_sources = ['arxiv', 'techcrunch', 'venturebeat', 'stanford', 'theverge', 'thehackernews']
-        sources_to_fetch = [s for s in sources_to_fetch if s in valid_sources]
+        sources_to_fetch = [s for s in sources_to_fetch if s in ingestion.SOURCE_NAMES]
         
         # Wenn keine gültigen Quellen vorhanden sind, leere Daten zurückgeben
         if not sources_to_fetch:
@@ -629,95 +408,25 @@ def refresh_dashboard_cache():
         
         # Fetch fresh data for the dashboard
         max_results = 5
-        all_data = {}
-        
-        # Fetch data only from selected sources
-        if 'arxiv' in sources_to_fetch:
-            try:
-                all_data['arxiv'] = arxiv_scraper.main_arxiv(categories=['cs.AI', 'cs.LG'], max_results=max_results)
-            except Exception as e:
-                app.logger.error(f"Error fetching ArXiv data: {str(e)}")
-            
-        if 'techcrunch' in sources_to_fetch:
-            try:
-                tech_results = techcrunch.main_techcrunch()
-                if tech_results:
-                    all_data['techcrunch'] = tech_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching TechCrunch data: {str(e)}")
-            
-        if 'theverge' in sources_to_fetch:
-            try:
-                verge_results = theverge.main_verge()
-                if verge_results:
-                    all_data['theverge'] = verge_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching The Verge data: {str(e)}")
+        results = ingestion.run_sources(sources_to_fetch, {
+            'arxiv_categories': ['cs.AI', 'cs.LG'],
+            'max_results': max_results
+        })
+        all_data = ingestion.collect_data(results, empty_on_error=False)
         
-        if 'thehackernews' in sources_to_fetch:
-            try:
-                thn_results = thn.main_thn()
-                if thn_results:
-                    all_data['thehackernews'] = thn_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching THN data: {str(e)}")
-            
-        if 'venturebeat' in sources_to_fetch:
-            try:
-                vb_results = venture_beat.main_venturebeat()
-                if vb_results:
-                    all_data['venturebeat'] = vb_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching VentureBeat data: {str(e)}")
-            
-        if 'stanford' in sources_to_fetch:
-            try:
-                stanford_results = stanford_ai.main_stanford()
-                if stanford_results:
-                    all_data['stanford'] = stanford_results[:max_results]
-            except Exception as e:
-                app.logger.error(f"Error fetching Stanford AI data: {str(e)}")
-        
-        # Extract keywords, counts, etc. for dashboard visualizations
-        keywords = {}
-        sources_count = {}
-        dates_count = {}
-        
-        # Process ArXiv data
-        if 'arxiv' in all_data and all_data['arxiv']:
-            sources_count['ArXiv'] = len(all_data['arxiv'])
-            for title, article_data in all_data['arxiv'].items():
-                # Process date
-                pub_date = article_data.get('published', '')
-                if pub_date:
-                    date_str = pub_date[:10] if isinstance(pub_date, str) else pub_date.strftime('%Y-%m-%d')
-                    dates_count[date_str] = dates_count.get(date_str, 0) + 1
-                
-                # Extract keywords from title and summary
-                for keyword in extract_keywords(title + " " + article_data.get('summary', '')):
-                    keywords[keyword] = keywords.get(keyword, 0) + 1
-        
-        # Process other sources
-        for source_name, articles in all_data.items():
-            if source_name != 'arxiv' and articles:
-                sources_count[source_name.capitalize()] = len(articles)
-                for article in articles:
-                    if isinstance(article, list) and len(article) >= 3:
-                        title = article[0]
-                        content = article[2]
-                        for keyword in extract_keywords(title + " " + content):
-                            keywords[keyword] = keywords.get(keyword, 0) + 1
+        # Extract keywords, per-source counts and dates
+        keywords, sources_count, dates_count = article_stats(all_data)
         
         # Prepare dashboard data object
         dashboard_data = {
             'success': True,
             'last_updated': now(),
-            'arxiv': all_data.get('arxiv', {}),
-            'techcrunch': all_data.get('techcrunch', []),
-            'theverge': all_data.get('theverge', []),
-            'thehackernews': all_data.get('thehackernews', []),
-            'venturebeat': all_data.get('venturebeat', []),
-            'stanford': all_data.get('stanford', []),
+            'arxiv': to_dicts(all_data.get('arxiv')),
+            'techcrunch': to_dicts(all_data.get('techcrunch')),
+            'theverge': to_dicts(all_data.get('theverge')),
+            'thehackernews': to_dicts(all_data.get('thehackernews')),
+            'venturebeat': to_dicts(all_data.get('venturebeat')),
+            'stanford': to_dicts(all_data.get('stanford')),
             'keywords': keywords,
             'sources': sources_count,
             'dates': dates_count,
@@ -740,6 +449,25 @@ def refresh_dashboard_cache():
             'message': f"An error occurred: {str(e)}"
         }), 500
 
+def article_stats(all_data):
+    """Keyword, per-source and per-date counts over {source: [Article]}"""
+    keywords = {}
+    sources_count = {}
+    dates_count = {}
+    for source_name, articles in all_data.items():
+        if not articles:
+            continue
+        label = 'ArXiv' if source_name == 'arxiv' else source_name.capitalize()
+        sources_count[label] = len(articles)
+        for article in articles:
+            if article.date:
+                dates_count[article.date] = dates_count.get(article.date, 0) + 1
+            
+            # Extract keywords from title and summary
+            for keyword in extract_keywords(article.title + " " + article.summary):
+                keywords[keyword] = keywords.get(keyword, 0) + 1
+    return keywords, sources_count, dates_count
+
 def extract_keywords(text):
     """Simple keyword extraction from text - replace with a more sophisticated method if needed"""
     if not text:
@@ -0,0 +1,72 @@
+import json
+from datetime import datetime, date
+
+# Reihenfolge der Spalten in der articles-Tabelle (ohne id/created_at)
+DB_COLUMNS = ('source', 'title', 'link', 'pub_date', 'summary', 'content', 'keywords', 'relevance_score')
+
+class Article:
+    """One scraped item; the record every source returns and every consumer reads"""
+
+    __slots__ = ('source', 'title', 'link', 'pub_date', 'summary', 'content',
+                 'authors', 'keywords', 'relevance_score', 'citations', 'summary_tier')
+
+    def __init__(self, source, title, link, summary='', pub_date=None, content='', authors='',
+                 keywords=None, relevance_score=0.0, citations=None, summary_tier=None):
+        self.source = source
+        self.title = title
+        self.link = link
+        self.summary = summary or ''
+        # Datumsangaben einheitlich als ISO-String
+        self.pub_date = pub_date.isoformat() if isinstance(pub_date, (datetime, date)) else pub_date
+        self.content = content or ''
+        self.authors = authors or ''
+        self.keywords = keywords or []
+        self.relevance_score = relevance_score or 0.0
+        self.citations = citations or {}
+        self.summary_tier = summary_tier
+
+    @property
+    def date(self):
+        """Publication date as YYYY-MM-DD, or '' if unknown"""
+        return (self.pub_date or '')[:10]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __repr__(self):
+        return f"Article({self.source!r}, {self.title!r})"
+
+def to_dicts(articles):
+    """JSON-ready list of dicts (API responses, session, exports)"""
+    return [a.to_dict() for a in articles or []]
+
+def from_dicts(dicts):
+    return [Article.from_dict(d) for d in dicts or []]
+
+def to_rows(articles, created_at=None):
+    """DB rows in DB_COLUMNS order plus created_at, ready for executemany()"""
+    created_at = created_at or datetime.now().isoformat()
+    return [
+        (a.source, a.title, a.link, a.pub_date or created_at, a.summary, a.content,
+         json.dumps(a.keywords), a.relevance_score, created_at)
+        for a in articles
+    ]
+
+def _load_keywords(value):
+    try:
+        keywords = json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return []
+    return keywords if isinstance(keywords, list) else []
+
+def from_rows(rows):
+    """Articles from DB rows selected in DB_COLUMNS order"""
+    return [
+        Article(source, title, link, summary, pub_date, content,
+                keywords=_load_keywords(keywords), relevance_score=relevance_score)
+        for source, title, link, pub_date, summary, content, keywords, relevance_score in rows
+    ]
@@ -1,16 +1,19 @@
 import key_manager
-import requests
+import pdf_downloader
 import arxiv
 import os
 import re
-from openai import OpenAI
+import json
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import llm
+from article import Article
 import logging
-import time
-from PyPDF2 import PdfReader
-import pdfplumber
+import pdf_extraction
 import relevance
 import citation
-import cache_utils
+import summarizer
 
 # Configuration
 ARXIV_CATEGORIES = ['cs.LG'] # 'cs.AI', 'cs.LG', 'cs.CV' LG for Machine Learning / 'st.LG' for statisctical ML
@@ -18,9 +21,26 @@ OUTPUT_DIR = 'research_papers'
 MAX_TITLE_LENGTH = 50  
 MAX_TEXT_LENGTH = 3000  
 RETRIES = 3
-DOWNLOAD_DELAY = 1
+# Obergrenze des extrahierten Texts (None = ganzes Paper); lange Texte fasst summarizer.py in Chunks zusammen
+EXTRACT_MAX_CHARS = 60000
+EXTRACT_MAX_PAGES = None
+EXTRACT_SECTIONS = ['abstract', 'introduction', 'conclusion']  # None = nur Textanfang
+# Inkrementelles Harvesting: pro Kategorie nur Papers seit der letzten Markierung
+# (nur für geplante Läufe über main.py; Dashboard und Abrufe zeigen immer die neuesten Papers)
+INCREMENTAL = True
+HARVEST_STATE_FILE = os.path.join('cache', 'arxiv_harvest_state.json')
+HARVEST_PAGE_SIZE = 50
+HARVEST_MAX_SCAN = 500  # Obergrenze gelesener Einträge pro Kategorie und Lauf
+HARVEST_SHARD_WORKERS = 4
+HARVEST_MAX_ATTEMPTS = 3  # fehlgeschlagene Versuche, nach denen ein Paper übersprungen wird
+# Zusammenfassungs-Stufen: 'abstract' (kein Download), 'abstract_intro', 'full' (PDF-Abschnitte)
+SUMMARY_TIERS = ['abstract', 'abstract_intro', 'full']
+SUMMARY_TIER = 'full'  # höchste erlaubte Stufe
+CATEGORY_TIERS = {}    # z.B. {'cs.CV': 'abstract'} überschreibt SUMMARY_TIER pro Kategorie
+# Mindest-Keyword-Relevanz (0-1) für die schwereren Stufen, sonst nur Abstract
+TIER_THRESHOLDS = {'abstract_intro': 0.3, 'full': 0.6}
+ABSTRACT_REWRITE = True  # Abstract-Stufe: Abstract per LLM zusammenfassen (False = Abstract unverändert übernehmen)
 
-client = OpenAI(api_key=key_manager.get_openai_key())
 
 # Setup logging
 logging.basicConfig(
@@ -46,6 +66,17 @@ def get_prompt_style(style):
     else:  # Kompakt oder unbekannt
         return "Fasse den folgenden wissenschaftlichen Text kurz und prägnant zusammen."
 
+def paper_from_result(result):
+    return {
+        'title': result.title,
+        'authors': [a.name for a in result.authors],
+        'published': result.published,
+        'summary': result.summary,
+        'pdf_url': f"https://arxiv.org/pdf/{result.entry_id.split('/')[-1]}.pdf",
+        'entry_id': result.entry_id,
+        'categories': list(result.categories)
+    }
+
 def scrape_arxiv(categories, max_results=10):
     try:
         client = arxiv.Client()
@@ -57,60 +88,185 @@ def scrape_arxiv(categories, max_results=10):
         
         papers = []
         for result in client.results(search):
-            papers.append({
-                'title': result.title,
-                'authors': [a.name for a in result.authors],
-                'published': result.published,
-                'summary': result.summary,
-                'pdf_url': f"https://arxiv.org/pdf/{result.entry_id.split('/')[-1]}.pdf",
-                'entry_id': result.entry_id
-            })
+            papers.append(paper_from_result(result))
         return papers
     except Exception as e:
         logging.error(f"arXiv API failed: {str(e)}")
         return []
 
-def download_pdf(paper):
-    for attempt in range(RETRIES):
+_harvest_state_lock = threading.Lock()
+
+def load_harvest_state():
+    """
+    High-water marks per category: {category: {'last_published', 'ids_at_mark',
+    'updated', 'saved_ids', 'attempts'}}
+    """
+    if os.path.exists(HARVEST_STATE_FILE):
         try:
-            filename = sanitize_pdf_filename(paper)
-            filepath = os.path.join(OUTPUT_DIR, filename)
-            
-            if os.path.exists(filepath):
-                logging.info(f"Skipping existing: {filename}")
-                return filepath
+            with open(HARVEST_STATE_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read arXiv harvest state: {e}")
+    return {}
 
-            pdf_url = paper['pdf_url']
-            logging.info(f"Downloading from: {pdf_url}")
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(pdf_url, headers=headers, timeout=10, stream=True)
-            response.raise_for_status()
+def save_harvest_marks(marks):
+    """Persist new high-water marks once their papers have been processed"""
+    if not marks:
+        return
+    with _harvest_state_lock:
+        state = load_harvest_state()
+        state.update(marks)
+        try:
+            os.makedirs(os.path.dirname(HARVEST_STATE_FILE), exist_ok=True)
+            with open(HARVEST_STATE_FILE, 'w') as f:
+                json.dump(state, f, indent=2)
+        except Exception as e:
+            logging.warning(f"Could not save arXiv harvest state: {e}")
 
-            if 'application/pdf' not in response.headers.get('Content-Type', ''):
-                raise ValueError("URL doesn't point to PDF content")
+def _new_mark(papers, old_mark):
+    if not papers:
+        return None
+    newest = max(paper['published'] for paper in papers)
+    ids = [paper['entry_id'] for paper in papers if paper['published'] == newest]
+    if old_mark and old_mark.get('last_published') == newest.isoformat():
+        ids = sorted(set(ids) | set(old_mark.get('ids_at_mark', [])))
+    return {
+        'last_published': newest.isoformat(),
+        'ids_at_mark': ids,
+        'updated': datetime.now().isoformat()
+    }
+
+def _finished_ids(mark):
+    """Papers past the mark that were saved already or failed HARVEST_MAX_ATTEMPTS times"""
+    mark = mark or {}
+    given_up = {entry_id for entry_id, count in mark.get('attempts', {}).items() if count >= HARVEST_MAX_ATTEMPTS}
+    return set(mark.get('saved_ids', [])) | given_up
+
+def harvest_category(category, max_results=10, mark=None):
+    """
+    Page through a category's newest submissions back to the high-water mark
+    (at most HARVEST_MAX_SCAN entries). Without a mark only the newest
+    max_results papers are read. Returns the new papers, newest first.
+    """
+    mark = mark or {}
+    mark_published = datetime.fromisoformat(mark['last_published']) if mark.get('last_published') else None
+    mark_ids = set(mark.get('ids_at_mark', []))
+
+    client = arxiv.Client(page_size=min(max_results, HARVEST_PAGE_SIZE), delay_seconds=3, num_retries=3)
+    search = arxiv.Search(
+        query=f"cat:{category}",
+        max_results=HARVEST_MAX_SCAN if mark_published else max_results,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Descending
+    )
+
+    papers = []
+    for result in client.results(search):
+        if mark_published:
+            if result.published < mark_published:
+                break  # Markierung erreicht: alles Weitere ist bekannt
+            if result.entry_id in mark_ids:
+                continue
+        papers.append(paper_from_result(result))
 
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+    if mark_published and len(papers) >= HARVEST_MAX_SCAN:
+        logging.warning(f"arXiv {category}: scan limit of {HARVEST_MAX_SCAN} reached before the harvest mark")
+    logging.info(f"arXiv {category}: {len(papers)} new papers since {mark.get('last_published', 'first run')}")
+    return papers
 
-            if not validate_pdf(filepath):
-                os.remove(filepath)
-                raise ValueError("Invalid PDF structure")
+def scrape_arxiv_incremental(categories, max_results=10):
+    """
+    Harvest each category as its own concurrent shard and keep the oldest
+    max_results new papers in total; newer ones are left for the next run.
+    Papers already saved (or given up on) by an earlier run are not selected again.
+    Returns (papers, shards); pass shards with the ids of the successfully
+    processed papers to completed_marks() and the result to save_harvest_marks().
+    """
+    state = load_harvest_state()
+    workers = max(1, min(HARVEST_SHARD_WORKERS, len(categories)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='arxiv') as executor:
+        futures = {
+            category: executor.submit(harvest_category, category, max_results, state.get(category))
+            for category in categories
+        }
 
-            return filepath
+    finished = set()
+    for category in categories:
+        finished |= _finished_ids(state.get(category))
 
+    papers = {}
+    harvested = {}
+    for category, future in futures.items():
+        try:
+            harvested[category] = future.result()
         except Exception as e:
-            logging.warning(f"Attempt {attempt+1} failed: {str(e)}")
-            if attempt < RETRIES - 1:
-                time.sleep(DOWNLOAD_DELAY * (attempt + 1))
-    
-    logging.error(f"Failed to download {paper['title']} after {RETRIES} attempts")
-    return None
+            logging.error(f"arXiv API failed for {category}: {str(e)}")
+            continue
+        # Cross-Listings nur einmal verarbeiten
+        for paper in harvested[category]:
+            if paper['entry_id'] not in finished:
+                papers.setdefault(paper['entry_id'], paper)
+
+    # Älteste zuerst: pro Kategorie bleibt so nur ein Block neuerer Papers übrig,
+    # den der nächste Lauf ab der neuen Markierung abholt
+    oldest_first = sorted(papers.values(), key=lambda paper: paper['published'])[:max_results]
+    selected = {paper['entry_id'] for paper in oldest_first}
+    shards = {
+        category: {
+            'papers': category_papers[::-1],  # alle seit der Markierung, älteste zuerst
+            'selected': {paper['entry_id'] for paper in category_papers if paper['entry_id'] in selected},
+            'mark': state.get(category)
+        }
+        for category, category_papers in harvested.items()
+    }
+    return oldest_first[::-1], shards
+
+def completed_marks(shards, processed_ids):
+    """
+    New high-water marks per category: the mark only moves up to the last
+    paper before the first one that was not processed, so failed papers
+    are harvested again on the next run. Papers processed beyond the mark are
+    kept in 'saved_ids', failed attempts are counted in 'attempts'; after
+    HARVEST_MAX_ATTEMPTS failures a paper no longer holds the mark back.
+    """
+    marks = {}
+    for category, shard in shards.items():
+        old_mark = shard['mark'] or {}
+        category_ids = {paper['entry_id'] for paper in shard['papers']}
+        saved = set(old_mark.get('saved_ids', [])) | (category_ids & set(processed_ids))
+        attempts = dict(old_mark.get('attempts', {}))
+        for entry_id in shard['selected'] - set(processed_ids):
+            attempts[entry_id] = attempts.get(entry_id, 0) + 1
+
+        done = []
+        for paper in shard['papers']:  # älteste zuerst
+            entry_id = paper['entry_id']
+            if entry_id not in saved:
+                if attempts.get(entry_id, 0) < HARVEST_MAX_ATTEMPTS:
+                    break
+                logging.warning(f"arXiv {category}: giving up on {entry_id} after {attempts[entry_id]} failed attempts")
+            done.append(paper)
+
+        passed = {paper['entry_id'] for paper in done}
+        mark = _new_mark(done, old_mark) or dict(old_mark)
+        mark['saved_ids'] = sorted(saved - passed)
+        mark['attempts'] = {entry_id: count for entry_id, count in attempts.items() if entry_id not in passed}
+        if mark.get('last_published') or mark['saved_ids'] or mark['attempts']:
+            marks[category] = mark
+    return marks
+
+def download_pdf(paper):
+    filepath = os.path.join(OUTPUT_DIR, sanitize_pdf_filename(paper))
+    logging.info(f"Downloading from: {paper['pdf_url']}")
+    return pdf_downloader.download(paper['pdf_url'], filepath, validate=validate_pdf, retries=RETRIES)
+
+def download_pdfs(papers):
+    """Download the PDFs of several papers concurrently; returns {entry_id: filepath or None}"""
+    jobs = [
+        (paper['entry_id'], paper['pdf_url'], os.path.join(OUTPUT_DIR, sanitize_pdf_filename(paper)))
+        for paper in papers
+    ]
+    return pdf_downloader.download_all(jobs, validate=validate_pdf)
 
 def validate_pdf(filepath):
     try:
@@ -129,35 +285,17 @@ def validate_pdf(filepath):
         return False
 
 def extract_text_from_pdf(pdf_path):
-    try:
-        with open(pdf_path, 'rb') as f:
-            reader = PdfReader(f)
-            text = '\n'.join([page.extract_text() for page in reader.pages])
-            if text.strip():
-                return text
-    except Exception as e:
-        logging.warning(f"PyPDF2 failed: {str(e)}")
-
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = '\n'.join([page.extract_text() for page in pdf.pages])
-            return text if text.strip() else None
-    except Exception as e:
-        logging.error(f"pdfplumber failed: {str(e)}")
-        return None
+    return pdf_extraction.extract_text(pdf_path)
 
-@cache_utils.cached(expiry=86400)  # Cache for 1 day
-def summarize_with_gpt(text, model="gpt-3.5-turbo"):
+def summarize_with_gpt(text, model=None):
     try:
-        response = client.chat.completions.create(
+        # Lange Texte: Map-Reduce über token-gemessene Chunks (summarizer.py)
+        return summarizer.summarize(
+            text,
+            "Summarize the given article and focus on the most important things:",
             model=model,
-            messages=[{
-                "role": "user",
-                "content": f"Summarize the given article and focus on the most important things{text[:MAX_TEXT_LENGTH]}"
-            }],
             max_tokens=300
         )
-        return response.choices[0].message.content.strip()
     except Exception as e:
         logging.error(f"GPT summarization failed: {str(e)}")
         return None
@@ -174,10 +312,36 @@ def generate_all_citations(paper):
         'bibtex': citation.generate_bibtex_citation(citation_data)
     }
 
-def main_arxiv(categories=['cs.LG'], max_results=10, citation_styles=None):
+def select_tier(paper, max_tier=None):
+    """Pick the summary tier for a paper from its categories and keyword relevance"""
+    tier = max_tier or SUMMARY_TIER
+    category_tiers = [CATEGORY_TIERS[cat] for cat in paper.get('categories', []) if cat in CATEGORY_TIERS]
+    if category_tiers:
+        # Kategorien dürfen die Stufe nur senken, nie über die erlaubte Obergrenze heben
+        tier = min(max(category_tiers, key=SUMMARY_TIERS.index), tier, key=SUMMARY_TIERS.index)
+    if tier == 'abstract':
+        return tier
+
+    # Schwere Stufen nur für Papers, die die Relevanzschwelle schaffen
+    score = relevance.calculate_keyword_score(f"{paper['title']}\n{paper['summary']}")
+    for candidate in reversed(SUMMARY_TIERS[1:SUMMARY_TIERS.index(tier) + 1]):
+        if score >= TIER_THRESHOLDS.get(candidate, 0):
+            return candidate
+    return 'abstract'
+
+def clean_abstract(abstract):
+    return ' '.join((abstract or '').split())
+
+def main_arxiv(categories=['cs.LG'], max_results=10, citation_styles=None, summary_tier=None, incremental=False):
     setup_environment()
     logging.info(f"Fetching papers from arXiv with categories: {categories}, max: {max_results}")
-    papers = scrape_arxiv(categories=categories, max_results=max_results)
+    if incremental:
+        papers, shards = scrape_arxiv_incremental(categories=categories, max_results=max_results)
+        if not papers:
+            logging.info("No new papers since the last harvest.")
+            return None
+    else:
+        papers, shards = scrape_arxiv(categories=categories, max_results=max_results), {}
     
     if not papers:
         logging.error("No papers retrieved. Exiting.")
@@ -188,21 +352,49 @@ def main_arxiv(categories=['cs.LG'], max_results=10, citation_styles=None):
     elif citation_styles == "all":
         citation_styles = ["apa", "mla", "chicago", "bibtex"]
 
-    summaries = {}
-    for paper in papers:
-        logging.info(f"\nProcessing: {paper['title']}")
-        
-        pdf_path = download_pdf(paper)
-        if not pdf_path:
-            continue
+    tiers = {paper['entry_id']: select_tier(paper, summary_tier) for paper in papers}
+    logging.info(f"Summary tiers: { {tier: list(tiers.values()).count(tier) for tier in SUMMARY_TIERS} }")
 
-        text = extract_text_from_pdf(pdf_path)
+    # PDFs nur für schwere Stufen parallel laden und im Prozess-Pool extrahieren
+    pdf_papers = [paper for paper in papers if tiers[paper['entry_id']] != 'abstract']
+    pdf_paths = download_pdfs(pdf_papers)
+    full_paths = [pdf_paths[p['entry_id']] for p in pdf_papers if pdf_paths.get(p['entry_id']) and tiers[p['entry_id']] == 'full']
+    intro_paths = [pdf_paths[p['entry_id']] for p in pdf_papers if pdf_paths.get(p['entry_id']) and tiers[p['entry_id']] == 'abstract_intro']
+    texts = pdf_extraction.extract_texts(
+        full_paths,
+        max_chars=EXTRACT_MAX_CHARS,
+        max_pages=EXTRACT_MAX_PAGES,
+        sections=EXTRACT_SECTIONS
+    )
+    texts.update(pdf_extraction.extract_texts(intro_paths, max_chars=MAX_TEXT_LENGTH, sections=['introduction']))
+
+    def summarize_paper(paper):
+        tier = tiers[paper['entry_id']]
+        abstract = clean_abstract(paper['summary'])
+        if tier == 'abstract':
+            return summarize_with_gpt(abstract) if ABSTRACT_REWRITE else abstract
+
+        pdf_path = pdf_paths.get(paper['entry_id'])
+        if not pdf_path:
+            return None
+        text = texts.get(pdf_path)
         if not text:
             logging.error(f"Failed to extract text from {pdf_path}")
-            continue
+            return None
+        if tier == 'abstract_intro':
+            text = f"Abstract:\n{abstract}\n\n{text}"
+        return summarize_with_gpt(text)
+
+    # Zusammenfassungen aller Papers gleichzeitig anfordern
+    paper_summaries = llm.run_concurrently(summarize_paper, papers)
 
-        summary = summarize_with_gpt(text)
+    summaries = []
+    processed_ids = set()
+    for paper, summary in zip(papers, paper_summaries):
+        logging.info(f"\nProcessing: {paper['title']}")
+        tier = tiers[paper['entry_id']]
         if summary:
+            processed_ids.add(paper['entry_id'])
             # Generate citations in requested styles
             paper_citations = {}
             for style in citation_styles:
@@ -214,13 +406,17 @@ def main_arxiv(categories=['cs.LG'], max_results=10, citation_styles=None):
                 except Exception as e:
                     logging.error(f"Failed to generate {style} citation: {str(e)}")
             
-            summaries[paper['title']] = {
-                'summary': summary,
-                'link': paper['pdf_url'],
-                'authors': ', '.join(paper['authors']),
-                'published': paper['published'].strftime('%Y-%m-%d'),
-                'citations': paper_citations  # Add citations to the data
-            }
+            summaries.append(Article(
+                'arxiv',
+                paper['title'],
+                paper['pdf_url'],
+                summary,
+                pub_date=paper['published'].strftime('%Y-%m-%d'),
+                content=summary,
+                authors=', '.join(paper['authors']),
+                citations=paper_citations,
+                summary_tier=tier
+            ))
             
             print(f"\nSummary for {paper['title']}:")
             print(summary)
@@ -235,4 +431,5 @@ def main_arxiv(categories=['cs.LG'], max_results=10, citation_styles=None):
         else:
             logging.warning("Failed to generate summary")
 
+    save_harvest_marks(completed_marks(shards, processed_ids))
     return summaries if summaries else None
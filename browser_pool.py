@@ -0,0 +1,195 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import rate_limiter
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import WebDriverException, TimeoutException, NoSuchElementException
+
+# ==== CONFIGURATION ====
+MAX_DRIVERS = int(os.environ.get('BROWSER_POOL_SIZE', 2))                    # gleichzeitig offene Browser/Tabs
+MAX_PAGES_PER_DRIVER = int(os.environ.get('BROWSER_MAX_PAGES_PER_DRIVER', 50))  # danach wird der Driver neu gestartet
+
+PAGE_LOAD_DEADLINE = float(os.environ.get('BROWSER_PAGE_DEADLINE', 30))  # harte Obergrenze pro Seite in Sekunden
+NETWORK_IDLE_TIME = 0.5  # so lange dürfen keine neuen Ressourcen nachgeladen werden
+POLL_INTERVAL = 0.2
+
+# Bilder, Fonts, Medien und gängige Third-Party-Skripte werden nicht geladen
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*connect.facebook.com*",
+    "*scorecardresearch.com*", "*chartbeat.com*", "*hotjar.com*", "*taboola.com*",
+    "*outbrain.com*", "*amazon-adsystem.com*", "*quantserve.com*",
+]
+
+# Bereitschaftsbedingung pro Seite: CSS-Selektor und/oder Netzwerk-Ruhe
+PAGE_STRATEGIES = {
+    'techcrunch_list': {'selector': 'a[href*="/20"]', 'network_idle': True},
+    'stanford_list': {'selector': '.post-teaser'},
+    'stanford_article': {'selector': '.post-content'},
+}
+
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_DRIVERS)
+_idle = []  # [{'driver': ..., 'pages': int}]
+
+def chrome_options():
+    """Headless Chrome options shared by all Selenium-based scrapers"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    # Wichtig: Diese Option ermöglicht Nutzung trotz Versionsunterschieden
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    options.add_experimental_option("useAutomationExtension", False)
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+    })
+    # Nicht auf alle Subressourcen warten, die Bereitschaft prüft load_page()
+    options.page_load_strategy = 'eager'
+    return options
+
+def _block_resources(driver):
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logging.warning(f"Resource blocking not available: {e}")
+
+def _start_driver():
+    options = chrome_options()
+    try:
+        # Versuche mit WebDriverManager
+        from webdriver_manager.chrome import ChromeDriverManager
+        from selenium.webdriver.chrome.service import Service
+        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    except Exception as e:
+        logging.warning(f"WebDriverManager fehlgeschlagen: {e} - versuche direkte WebDriver-Initialisierung")
+        # Fallback auf direkten WebDriver ohne Manager
+        driver = webdriver.Chrome(options=options)
+    _block_resources(driver)
+    logging.info("Started pooled Chrome driver")
+    return driver
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logging.warning(f"Error quitting Chrome driver: {e}")
+
+def _is_alive(driver):
+    try:
+        driver.window_handles
+        return True
+    except Exception:
+        return False
+
+def _checkout():
+    while True:
+        with _lock:
+            entry = _idle.pop() if _idle else None
+        if entry is None:
+            return {'driver': _start_driver(), 'pages': 0}
+        if _is_alive(entry['driver']):
+            return entry
+        # Abgestürzter Browser: verwerfen und den nächsten versuchen
+        _quit(entry['driver'])
+
+@contextmanager
+def browser():
+    """
+    Borrow a Chrome driver from the pool.
+    Drivers are started lazily, reused across pages and sources, and
+    recycled after MAX_PAGES_PER_DRIVER pages or when they crash.
+    At most MAX_DRIVERS are in use at the same time.
+    """
+    _slots.acquire()
+    try:
+        entry = _checkout()
+        crashed = False
+        try:
+            yield entry['driver']
+        except (TimeoutException, NoSuchElementException):
+            raise
+        except WebDriverException:
+            crashed = True
+            raise
+        finally:
+            entry['pages'] += 1
+            if crashed or entry['pages'] >= MAX_PAGES_PER_DRIVER:
+                _quit(entry['driver'])
+            else:
+                with _lock:
+                    _idle.append(entry)
+    finally:
+        _slots.release()
+
+def _network_idle(driver, state):
+    count = driver.execute_script("return performance.getEntriesByType('resource').length")
+    ready = driver.execute_script("return document.readyState") != 'loading'
+    now = time.monotonic()
+    if count != state.get('count'):
+        state['count'] = count
+        state['since'] = now
+        return False
+    return ready and now - state['since'] >= NETWORK_IDLE_TIME
+
+def load_page(driver, url, strategy=None, deadline=None):
+    """
+    Navigate to url and return as soon as the page strategy's ready
+    condition holds (selector present and/or network idle), at the latest
+    after the deadline. strategy is a PAGE_STRATEGIES key or dict.
+    Returns True if the page became ready in time.
+    """
+    if isinstance(strategy, str):
+        strategy = PAGE_STRATEGIES[strategy]
+    strategy = strategy or {'network_idle': True}
+    deadline = deadline or PAGE_LOAD_DEADLINE
+
+    rate_limiter.acquire(url)
+    start = time.monotonic()
+    driver.set_page_load_timeout(deadline)
+    try:
+        driver.get(url)
+    except TimeoutException:
+        driver.execute_script("window.stop();")
+
+    ready = True
+    try:
+        if strategy.get('selector'):
+            remaining = max(0.1, deadline - (time.monotonic() - start))
+            WebDriverWait(driver, remaining, poll_frequency=POLL_INTERVAL).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, strategy['selector'])
+            )
+        if strategy.get('network_idle'):
+            remaining = max(0.1, deadline - (time.monotonic() - start))
+            state = {}
+            WebDriverWait(driver, remaining, poll_frequency=POLL_INTERVAL).until(
+                lambda d: _network_idle(d, state)
+            )
+    except TimeoutException:
+        ready = False
+
+    elapsed = time.monotonic() - start
+    logging.info(f"Page {url} {'ready' if ready else 'hit deadline'} after {elapsed:.2f}s")
+    return ready
+
+def shutdown():
+    """Quit all idle drivers"""
+    with _lock:
+        entries = list(_idle)
+        _idle.clear()
+    for entry in entries:
+        _quit(entry['driver'])
+
+atexit.register(shutdown)
@@ -4,10 +4,109 @@ import os
 import hashlib
 import time
 import logging
+import threading
+from collections import OrderedDict
 
 CACHE_DIR = "cache"
 DEFAULT_EXPIRY = 3600  # 1 hour in seconds
 
+# In-memory tier in front of the pickle files (per namespace = key without its last '_' part)
+MEMORY_CACHE_ENABLED = os.environ.get('MEMORY_CACHE_ENABLED', '1') != '0'
+MEMORY_CACHE_MAX_BYTES = int(os.environ.get('MEMORY_CACHE_MAX_BYTES', 16 * 1024 * 1024))  # pro Namespace
+MEMORY_CACHE_TTL = int(os.environ.get('MEMORY_CACHE_TTL', 300))
+NAMESPACE_LIMITS = {
+    'dashboard_data': {'max_bytes': 32 * 1024 * 1024, 'ttl': 300},
+    'analyze_relevance': {'max_bytes': 4 * 1024 * 1024, 'ttl': 86400},
+    'query': {'max_bytes': 8 * 1024 * 1024, 'ttl': 600},
+}
+
+class MemoryCache:
+    """
+    LRU of unpickled values with TTL and byte accounting (pickled size),
+    bounded per namespace. Hits return the cached object itself, so
+    callers must not mutate it.
+    """
+
+    def __init__(self, limits=None, default_max_bytes=MEMORY_CACHE_MAX_BYTES, default_ttl=MEMORY_CACHE_TTL):
+        self.limits = limits or {}
+        self.default_max_bytes = default_max_bytes
+        self.default_ttl = default_ttl
+        self.namespaces = {}  # Namespace -> OrderedDict[key -> (expires_at, size, value)]
+        self.sizes = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def _limit(self, namespace, name):
+        default = self.default_max_bytes if name == 'max_bytes' else self.default_ttl
+        return self.limits.get(namespace, {}).get(name, default)
+
+    def _count(self, namespace, name):
+        counters = self.stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'evictions': 0})
+        counters[name] += 1
+
+    def _drop(self, namespace, key):
+        _, size, _ = self.namespaces[namespace].pop(key)
+        self.sizes[namespace] -= size
+
+    def get(self, namespace, key):
+        with self.lock:
+            entries = self.namespaces.get(namespace)
+            entry = entries.get(key) if entries else None
+            if entry is None:
+                self._count(namespace, 'misses')
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(namespace, key)
+                self._count(namespace, 'misses')
+                return None
+            entries.move_to_end(key)
+            self._count(namespace, 'hits')
+            return entry[2]
+
+    def put(self, namespace, key, value, size, ttl=None):
+        ttl = self._limit(namespace, 'ttl') if ttl is None else min(ttl, self._limit(namespace, 'ttl'))
+        max_bytes = self._limit(namespace, 'max_bytes')
+        with self.lock:
+            entries = self.namespaces.setdefault(namespace, OrderedDict())
+            self.sizes.setdefault(namespace, 0)
+            if key in entries:
+                self._drop(namespace, key)
+            if ttl <= 0 or size > max_bytes:
+                return
+            entries[key] = (time.monotonic() + ttl, size, value)
+            self.sizes[namespace] += size
+            # Älteste Einträge verdrängen, bis der Namespace wieder ins Budget passt
+            while self.sizes[namespace] > max_bytes:
+                self._drop(namespace, next(iter(entries)))
+                self._count(namespace, 'evictions')
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                namespace: dict(self.stats.get(namespace, {'hits': 0, 'misses': 0, 'evictions': 0}),
+                                entries=len(self.namespaces.get(namespace, ())),
+                                bytes=self.sizes.get(namespace, 0),
+                                max_bytes=self._limit(namespace, 'max_bytes'))
+                for namespace in set(self.stats) | set(self.namespaces)
+            }
+
+_memory = MemoryCache(NAMESPACE_LIMITS)
+
+def namespace_of(key):
+    """'dashboard_data_arxiv-techcrunch' -> 'dashboard_data'"""
+    return key.rsplit('_', 1)[0]
+
+def _memory_get(key):
+    return _memory.get(namespace_of(key), key) if MEMORY_CACHE_ENABLED else None
+
+def _memory_put(key, value, size, ttl=None):
+    if MEMORY_CACHE_ENABLED:
+        _memory.put(namespace_of(key), key, value, size, ttl)
+
+def get_memory_stats():
+    """Hits, misses, evictions, entries and bytes per namespace of the in-memory tier"""
+    return _memory.get_stats()
+
 def setup_cache():
     """Ensure cache directory exists"""
     os.makedirs(CACHE_DIR, exist_ok=True)
@@ -23,8 +122,12 @@ def cached(expiry=DEFAULT_EXPIRY):
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            setup_cache()
             cache_key = get_cache_key(func.__name__, args, kwargs)
+            result = _memory_get(cache_key)
+            if result is not None:
+                return result
+
+            setup_cache()
             cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
             
             # Check if cache exists and is not expired
@@ -33,9 +136,11 @@ def cached(expiry=DEFAULT_EXPIRY):
                 if file_age < expiry:
                     try:
                         with open(cache_file, 'rb') as f:
-                            result = pickle.load(f)
-                            logging.info(f"Cache hit for {func.__name__}")
-                            return result
+                            payload = f.read()
+                        result = pickle.loads(payload)
+                        logging.info(f"Cache hit for {func.__name__}")
+                        _memory_put(cache_key, result, len(payload), expiry - file_age)
+                        return result
                     except Exception as e:
                         logging.warning(f"Cache read error: {e}")
             
@@ -44,8 +149,10 @@ def cached(expiry=DEFAULT_EXPIRY):
             
             # Save result to cache
             try:
+                payload = pickle.dumps(result)
                 with open(cache_file, 'wb') as f:
-                    pickle.dump(result, f)
+                    f.write(payload)
+                _memory_put(cache_key, result, len(payload), expiry)
             except Exception as e:
                 logging.warning(f"Cache write error: {e}")
                 
@@ -54,14 +161,21 @@ def cached(expiry=DEFAULT_EXPIRY):
     return decorator
 
 def get_cached_data(key):
-    """Retrieve data from cache by key"""
+    """Retrieve data from cache by key (memory first, then disk)"""
+    data = _memory_get(key)
+    if data is not None:
+        return data
+
     setup_cache()
     cache_file = os.path.join(CACHE_DIR, f"{key}.pkl")
     
     if os.path.exists(cache_file):
         try:
             with open(cache_file, 'rb') as f:
-                return pickle.load(f)
+                payload = f.read()
+            data = pickle.loads(payload)
+            _memory_put(key, data, len(payload))
+            return data
         except Exception as e:
             logging.warning(f"Cache read error: {e}")
     
@@ -73,8 +187,10 @@ def save_to_cache(key, data, expiry=DEFAULT_EXPIRY):
     cache_file = os.path.join(CACHE_DIR, f"{key}.pkl")
     
     try:
+        payload = pickle.dumps(data)
         with open(cache_file, 'wb') as f:
-            pickle.dump(data, f)
+            f.write(payload)
+        _memory_put(key, data, len(payload), expiry)
         return True
     except Exception as e:
         logging.warning(f"Cache write error: {e}")
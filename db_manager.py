@@ -1,7 +1,6 @@
 import sqlite3
-import json
 import os
-from datetime import datetime
+from article import DB_COLUMNS, to_rows, from_rows
 
 # Use a default path but allow overriding it through a parameter
 def init_db(db_path="research_data.db"):
@@ -45,67 +44,35 @@ def init_db(db_path="research_data.db"):
 # Default database path (will be overridden when init_db is called)
 DB_PATH = "research_data.db"
 
-def save_article(source, article_data):
-    """Save an article to the database"""
+def save_articles(articles):
+    """Insert or update a batch of Article records in one transaction"""
+    if not articles:
+        return
+
     conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Extract common fields from different source formats
-    title = article_data.get('title') or article_data.get('Titel', '')
-    link = article_data.get('link') or article_data.get('Link', '')
-    
-    # Format pub_date to ISO format string
-    pub_date = article_data.get('pub_date') or article_data.get('Datum', datetime.now())
-    if isinstance(pub_date, datetime):
-        pub_date = pub_date.isoformat()
-    
-    summary = (article_data.get('summary') or 
-               article_data.get('Zusammenfassung', ''))
-    
-    content = article_data.get('content', '')
-    keywords = json.dumps(article_data.get('keywords', []))
-    relevance_score = article_data.get('relevance_score', 0.0)
-    
-    # Check if article already exists
-    cursor.execute('SELECT id FROM articles WHERE source=? AND link=?', 
-                  (source, link))
-    existing = cursor.fetchone()
-    
-    if existing:
-        # Update existing article
-        cursor.execute('''
-        UPDATE articles 
-        SET summary=?, content=?, keywords=?, relevance_score=?
-        WHERE source=? AND link=?
-        ''', (summary, content, keywords, relevance_score, source, link))
-    else:
-        # Insert new article
-        cursor.execute('''
-        INSERT INTO articles 
+    with conn:
+        # Vorhandene Artikel (gleicher Link) behalten Titel/Datum, Inhalt wird aktualisiert
+        conn.executemany('''
+        INSERT INTO articles
         (source, title, link, pub_date, summary, content, keywords, relevance_score, created_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (source, title, link, pub_date, summary, content, keywords, 
-              relevance_score, datetime.now().isoformat()))
-    
-    conn.commit()
+        ON CONFLICT(link) DO UPDATE SET
+            summary=excluded.summary, content=excluded.content,
+            keywords=excluded.keywords, relevance_score=excluded.relevance_score
+        ''', to_rows(articles))
     conn.close()
 
-def save_batch(source, articles):
-    """Save a batch of articles to the database"""
-    if not articles:
-        return
-        
-    for article in articles:
-        save_article(source, article)
+def save_article(article):
+    """Save a single Article record to the database"""
+    save_articles([article])
 
 def get_recent_articles(hours=24, sources=None):
-    """Get recent articles from the database"""
+    """Get recent articles from the database as Article records"""
     conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
-    query = '''
-    SELECT * FROM articles 
+    query = f'''
+    SELECT {', '.join(DB_COLUMNS)} FROM articles 
     WHERE datetime(created_at) >= datetime('now', ?)
     '''
     params = [f'-{hours} hours']
@@ -116,7 +83,7 @@ def get_recent_articles(hours=24, sources=None):
         params.extend(sources)
     
     cursor.execute(query, params)
-    articles = [dict(row) for row in cursor.fetchall()]
+    articles = from_rows(cursor.fetchall())
     
     conn.close()
     return articles
@@ -0,0 +1,285 @@
+import os
+import re
+import json
+import random
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+import db_manager
+
+# Configuration
+ENABLED = os.environ.get('DEDUP_ENABLED', '1') != '0'
+# Geschätzte Jaccard-Ähnlichkeit; an umformulierten Meldungen gemessen liegen Duplikate
+# bei ~0.3-0.5, verschiedene Meldungen desselben Unternehmens bei höchstens ~0.15
+THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.24))
+WINDOW_DAYS = int(os.environ.get('DEDUP_WINDOW_DAYS', 7))  # nur mit Artikeln der letzten Tage vergleichen
+NUM_PERM = 128
+BANDS = 64  # LSH: 64 Bänder à 2 Zeilen, Kandidaten ab ~0.15 Ähnlichkeit
+ROWS = NUM_PERM // BANDS
+LEAD_WORDS = 200  # Titel + Anfang des Artikels reichen für dieselbe Meldung
+# Wörter inkl. Bindestrich/Punkt ("gpt-5", "3.7"), sonst zerfallen Produktnamen in Allerweltsteile
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[-.][a-z0-9]+)*')
+SUFFIXES = ('ing', 'ed', 'es', 's')
+# Rückgabewert der Scraper für Duplikate, deren Meldung noch keine Zusammenfassung hat
+PENDING = object()
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+STOPWORDS = {
+    'the', 'and', 'for', 'that', 'with', 'this', 'from', 'are', 'was', 'has', 'have', 'its', 'will',
+    'but', 'not', 'they', 'their', 'about', 'which', 'more', 'than', 'been', 'also', 'into', 'can',
+    'said', 'says', 'new', 'you', 'our', 'who', 'what', 'when', 'how', 'all', 'one', 'would'
+}
+
+_lock = threading.Lock()
+_stats = {'checked': 0, 'duplicates': 0}
+_tables_ready = set()
+
+def _connect():
+    conn = sqlite3.connect(db_manager.DB_PATH, timeout=10)
+    if db_manager.DB_PATH not in _tables_ready:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            link TEXT PRIMARY KEY,
+            source TEXT,
+            title TEXT,
+            signature TEXT NOT NULL,
+            cluster_id TEXT NOT NULL,
+            created_at TEXT,
+            summarized INTEGER NOT NULL DEFAULT 1
+        )
+        ''')
+        # Ältere Indizes: bestehende Einträge gelten als zusammengefasst
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(fingerprints)')]
+        if 'summarized' not in columns:
+            conn.execute('ALTER TABLE fingerprints ADD COLUMN summarized INTEGER NOT NULL DEFAULT 1')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS fingerprint_bands (
+            band INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            link TEXT NOT NULL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_fingerprint_bands ON fingerprint_bands(band, bucket)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_fingerprints_cluster ON fingerprints(cluster_id)')
+        # Bänder außerhalb des Vergleichsfensters werden nicht mehr gebraucht
+        since = (datetime.now() - timedelta(days=WINDOW_DAYS)).isoformat()
+        conn.execute('DELETE FROM fingerprint_bands WHERE link IN (SELECT link FROM fingerprints WHERE created_at < ?)', (since,))
+        conn.commit()
+        _tables_ready.add(db_manager.DB_PATH)
+    return conn
+
+def _stem(word):
+    for suffix in SUFFIXES:
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def _words(text):
+    return [_stem(w) for w in TOKEN_PATTERN.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+def _tokens(title, text):
+    # Titelwörter zählen doppelt: bei kurzen oder boilerplate-lastigen Texten trägt der Titel die Meldung
+    lead = ' '.join((text or '').split()[:LEAD_WORDS])
+    return set(_words(f"{title} {lead}")) | {f"title:{w}" for w in _words(title)}
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def signature(title, text):
+    """MinHash signature (NUM_PERM values) over the stemmed title and lead words"""
+    hashes = [_token_hash(t) for t in _tokens(title, text)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+def _buckets(sig):
+    return [(band, hashlib.md5(json.dumps(sig[band * ROWS:(band + 1) * ROWS]).encode()).hexdigest())
+            for band in range(BANDS)]
+
+def claim(source, title, link, text):
+    """
+    Register an article in the fingerprint index before it is summarized.
+    Returns (cluster_id, is_representative): cluster_id is the link of the
+    first article of the story; only the representative should be summarized.
+    """
+    if not ENABLED:
+        return link, True
+    sig = signature(title, text)
+    if sig is None:
+        return link, True
+
+    with _lock:
+        _stats['checked'] += 1
+        try:
+            conn = _connect()
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+            return link, True
+        try:
+            with conn:
+                row = conn.execute('SELECT cluster_id FROM fingerprints WHERE link=?', (link,)).fetchone()
+                if row:
+                    # Erneut verarbeiteter Artikel behält seinen Cluster
+                    return row[0], row[0] == link
+
+                buckets = _buckets(sig)
+                since = (datetime.now() - timedelta(days=WINDOW_DAYS)).isoformat()
+                where = ' OR '.join(['(b.band=? AND b.bucket=?)'] * len(buckets))
+                candidates = conn.execute(f'''
+                SELECT DISTINCT f.link, f.signature, f.cluster_id FROM fingerprint_bands b
+                JOIN fingerprints f ON f.link = b.link
+                WHERE ({where}) AND f.created_at >= ?
+                ''', [value for bucket in buckets for value in bucket] + [since]).fetchall()
+
+                best, best_score = None, THRESHOLD
+                for other_link, other_sig, cluster_id in candidates:
+                    other_sig = json.loads(other_sig)
+                    if len(other_sig) != NUM_PERM:
+                        continue  # Signatur aus einer älteren Konfiguration
+                    score = similarity(sig, other_sig)
+                    if score >= best_score:
+                        best, best_score = cluster_id, score
+                cluster_id = best or link
+
+                conn.execute('INSERT INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, 0)',
+                             (link, source, title, json.dumps(sig), cluster_id, datetime.now().isoformat()))
+                conn.executemany('INSERT INTO fingerprint_bands VALUES (?, ?, ?)',
+                                 [(band, bucket, link) for band, bucket in buckets])
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+            return link, True
+        finally:
+            conn.close()
+
+        if best:
+            _stats['duplicates'] += 1
+            logging.info(f"Near-duplicate ({best_score:.2f}): {source} '{title}' -> {best}")
+        return cluster_id, best is None
+
+def release(link):
+    """
+    Remove a representative that got no summary (rejected or failed), so a
+    near-duplicate from another source is summarized instead. Members that
+    already joined its cluster move to the oldest remaining member.
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        try:
+            conn = _connect()
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+            return
+        try:
+            with conn:
+                conn.execute('DELETE FROM fingerprint_bands WHERE link=?', (link,))
+                conn.execute('DELETE FROM fingerprints WHERE link=?', (link,))
+                row = conn.execute('SELECT link FROM fingerprints WHERE cluster_id=? ORDER BY created_at LIMIT 1',
+                                   (link,)).fetchone()
+                if row:
+                    conn.execute('UPDATE fingerprints SET cluster_id=? WHERE cluster_id=?', (row[0], link))
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+        finally:
+            conn.close()
+
+def _mark_summarized(link):
+    with _lock:
+        try:
+            conn = _connect()
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+            return
+        try:
+            with conn:
+                conn.execute('UPDATE fingerprints SET summarized=1 WHERE link=?', (link,))
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+        finally:
+            conn.close()
+
+def pending(cluster_id):
+    """
+    True while the story's representative has no summary yet. Duplicates should
+    then stay unprocessed: if the representative fails, release() promotes one
+    of them and the next run summarizes it.
+    """
+    if not ENABLED:
+        return False
+    with _lock:
+        try:
+            conn = _connect()
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+            return False
+        try:
+            row = conn.execute('SELECT summarized, created_at FROM fingerprints WHERE link=?', (cluster_id,)).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Dedup index error: {e}")
+            return False
+        finally:
+            conn.close()
+    if not row:
+        return True  # Repräsentant wurde freigegeben
+    # Hängengebliebene Repräsentanten halten ihre Duplikate nur bis zum Ende des Fensters auf
+    since = (datetime.now() - timedelta(days=WINDOW_DAYS)).isoformat()
+    return not row[0] and row[1] >= since
+
+def summarize_claimed(link, summarize, *args, **kwargs):
+    """
+    Run summarize(*args, **kwargs) for the claimed representative link and
+    release the claim if it raises or returns nothing.
+    """
+    try:
+        result = summarize(*args, **kwargs)
+    except Exception:
+        release(link)
+        raise
+    if result:
+        _mark_summarized(link)
+    else:
+        release(link)
+    return result
+
+def related_articles(links):
+    """Other members of each link's story cluster: {link: [{'source', 'title', 'link'}, ...]}"""
+    links = [link for link in links if link]
+    if not links:
+        return {}
+    conn = _connect()
+    try:
+        placeholders = ', '.join('?' * len(links))
+        rows = conn.execute(f'''
+        SELECT own.link, other.source, other.title, other.link FROM fingerprints own
+        JOIN fingerprints other ON other.cluster_id = own.cluster_id AND other.link != own.link
+        WHERE own.link IN ({placeholders})
+        ORDER BY other.created_at
+        ''', links).fetchall()
+    except sqlite3.Error as e:
+        logging.warning(f"Dedup index error: {e}")
+        return {}
+    finally:
+        conn.close()
+    related = {}
+    for link, source, title, other_link in rows:
+        related.setdefault(link, []).append({'source': source, 'title': title, 'link': other_link})
+    return related
+
+def add_related(items, link_key='link'):
+    """Attach the story cluster as items[i]['related'] to a list of article dicts"""
+    related = related_articles([item.get(link_key) for item in items])
+    for item in items:
+        item['related'] = related.get(item.get(link_key), [])
+    return items
+
+def get_stats():
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+import rate_limiter
+
+# Configuration
+CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 20))
+MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))
+BACKOFF_BASE = 0.5   # Sekunden, verdoppelt sich pro Versuch
+BACKOFF_MAX = 20
+RETRY_STATUS = {429, 500, 502, 503, 504}
+POOL_CONNECTIONS = 20  # Anzahl gecachter Host-Pools
+POOL_MAXSIZE = 10      # Keep-Alive-Verbindungen pro Host
+
+# Validatoren (ETag, Last-Modified, Inhalts-Hash) pro Feed-/Listen-URL
+VALIDATORS_FILE = os.path.join('cache', 'http_validators.json')
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Brotli wird von urllib3 nur dekodiert, wenn das Paket installiert ist
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+_session = None
+_session_lock = threading.Lock()
+_validators_lock = threading.Lock()
+_pending_validators = {}
+
+class _NotModified:
+    """Scraper result for an unchanged feed: empty like [], but distinguishable from 'no articles'"""
+
+    def __bool__(self):
+        return False
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+    def __repr__(self):
+        return 'NOT_MODIFIED'
+
+NOT_MODIFIED = _NotModified()
+
+def get_session():
+    """Return the shared, connection-pooling requests session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({
+                    'User-Agent': USER_AGENT,
+                    'Accept-Encoding': ACCEPT_ENCODING,
+                    'Connection': 'keep-alive'
+                })
+                _session = session
+    return _session
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter; honours a Retry-After header if given"""
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def request(method, url, timeout=None, retries=None, **kwargs):
+    """
+    Send a request through the shared session.
+    Retries connection errors, timeouts and RETRY_STATUS responses with
+    exponential backoff. Returns the last response or raises the last error.
+    """
+    session = get_session()
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    retries = MAX_RETRIES if retries is None else retries
+
+    for attempt in range(retries + 1):
+        # Höflichkeit pro Host statt globaler Pausen im Scraper
+        rate_limiter.acquire(url)
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
+            logging.warning(f"HTTP {method} {url} failed ({e}), retry {attempt + 1}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code in RETRY_STATUS and attempt < retries:
+            delay = backoff_delay(attempt, response.headers.get('Retry-After'))
+            logging.warning(f"HTTP {method} {url} returned {response.status_code}, retry {attempt + 1}/{retries} in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+            continue
+
+        return response
+
+def get(url, **kwargs):
+    """GET through the shared session (see request())"""
+    return request('GET', url, **kwargs)
+
+def _load_validators():
+    if os.path.exists(VALIDATORS_FILE):
+        try:
+            with open(VALIDATORS_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read HTTP validators: {e}")
+    return {}
+
+def conditional_get(url, **kwargs):
+    """
+    GET that sends If-None-Match/If-Modified-Since from the last committed fetch of url.
+    Returns None if the server answers 304 or the body hash is unchanged,
+    otherwise the response. Call commit_validators(url) once the content
+    has been processed so the next poll can short-circuit.
+    """
+    with _validators_lock:
+        validators = _load_validators().get(url, {})
+
+    headers = dict(kwargs.pop('headers', None) or {})
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+
+    response = get(url, headers=headers, **kwargs)
+    if response.status_code == 304:
+        logging.info(f"{url} not modified (304)")
+        return None
+    if response.status_code != 200:
+        return response
+
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    if content_hash == validators.get('content_hash'):
+        logging.info(f"{url} unchanged (identical body)")
+        return None
+
+    with _validators_lock:
+        _pending_validators[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': content_hash,
+            'fetched_at': datetime.now().isoformat()
+        }
+    return response
+
+def commit_validators(url):
+    """Persist the validators of the last conditional_get(url)"""
+    with _validators_lock:
+        pending = _pending_validators.pop(url, None)
+        if pending is None:
+            return False
+        validators = _load_validators()
+        validators[url] = pending
+        try:
+            os.makedirs(os.path.dirname(VALIDATORS_FILE), exist_ok=True)
+            with open(VALIDATORS_FILE, 'w') as f:
+                json.dump(validators, f)
+            return True
+        except Exception as e:
+            logging.warning(f"Could not save HTTP validators: {e}")
+            return False
@@ -0,0 +1,147 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import cache_utils
+import http_client
+import providers
+
+# Configuration
+SOURCE_NAMES = ['arxiv', 'techcrunch', 'venturebeat', 'stanford', 'theverge', 'thehackernews']
+MAX_WORKERS = int(os.environ.get('INGESTION_MAX_WORKERS', len(SOURCE_NAMES)))
+DEFAULT_TIMEOUT = float(os.environ.get('INGESTION_SOURCE_TIMEOUT', 600))  # Sekunden pro Quelle
+SOURCE_TIMEOUTS = {
+    'arxiv': 900,
+    'stanford': 900,
+}
+POLL_INTERVAL = 0.5
+
+logger = logging.getLogger('ai_research_hub.ingestion')
+
+def _run_arxiv(options):
+    return providers.scraper('arxiv').main_arxiv(
+        categories=options.get('arxiv_categories', ['cs.LG']),
+        max_results=options.get('max_results', 10),
+        citation_styles=options.get('citation_styles')
+    )
+
+# Scraper-Module werden erst beim ersten Lauf einer Quelle importiert
+SOURCE_RUNNERS = {
+    'arxiv': _run_arxiv,
+    'techcrunch': lambda options: providers.scraper('techcrunch').main_techcrunch(),
+    'venturebeat': lambda options: providers.scraper('venturebeat').main_venturebeat(),
+    'stanford': lambda options: providers.scraper('stanford').main_stanford(),
+    'theverge': lambda options: providers.scraper('theverge').main_verge(),
+    'thehackernews': lambda options: providers.scraper('thehackernews').main_thn(),
+}
+
+def valid_sources(sources):
+    """Filter a list of requested sources down to the known ones, keeping order"""
+    return [s for s in SOURCE_NAMES if s in (sources or [])]
+
+def _new_result(name):
+    return {'source': name, 'data': None, 'error': None, 'timed_out': False, 'not_modified': False,
+            'duration': None}
+
+def _payload_key(name):
+    return f"source_data_{name}"
+
+def run_sources(sources, options=None, max_workers=None, timeouts=None):
+    """
+    Run the selected scrapers concurrently and report per-source results.
+    Returns a dict mapping source name to
+    {'source', 'data', 'error', 'timed_out', 'not_modified', 'duration'}.
+    A source whose feed is unchanged (http_client.NOT_MODIFIED) gets its
+    last non-empty payload back instead of an empty list.
+    """
+    options = options or {}
+    names = valid_sources(sources)
+    results = {name: _new_result(name) for name in names}
+    if not names:
+        return results
+
+    timeouts = dict(SOURCE_TIMEOUTS, **(timeouts or {}))
+    workers = max(1, min(max_workers or MAX_WORKERS, len(names)))
+    max_results = options.get('max_results')
+    started = {}
+
+    def call(name):
+        started[name] = time.monotonic()
+        return SOURCE_RUNNERS[name](options)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest')
+    futures = {executor.submit(call, name): name for name in names}
+    pending = set(futures)
+    batch_start = time.monotonic()
+
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+
+            for future in done:
+                name = futures[future]
+                result = results[name]
+                result['duration'] = round(now - started.get(name, now), 3)
+                try:
+                    data = future.result()
+                    if data is http_client.NOT_MODIFIED:
+                        result['not_modified'] = True
+                        data = cache_utils.get_cached_data(_payload_key(name))
+                        logger.info(f"Source {name} unchanged, reusing {len(data or [])} previous articles")
+                    elif isinstance(data, list) and data:
+                        cache_utils.save_to_cache(_payload_key(name), data)
+                    # Listen-Ergebnisse auf die gewünschte Anzahl begrenzen
+                    if isinstance(data, list) and max_results:
+                        data = data[:max_results]
+                    result['data'] = data
+                    logger.info(f"Source {name} finished in {result['duration']}s")
+                except Exception as e:
+                    result['error'] = str(e)
+                    logger.error(f"Error fetching {name} data: {str(e)}")
+
+            # Quellen, die ihr Zeitbudget überschritten haben, nicht weiter abwarten
+            for future in list(pending):
+                name = futures[future]
+                if name in started and now - started[name] > timeouts.get(name, DEFAULT_TIMEOUT):
+                    pending.discard(future)
+                    future.cancel()
+                    result = results[name]
+                    result['timed_out'] = True
+                    result['duration'] = round(now - started[name], 3)
+                    result['error'] = f"Timed out after {timeouts.get(name, DEFAULT_TIMEOUT)}s"
+                    logger.error(f"Source {name} timed out after {result['duration']}s")
+    finally:
+        # Hängende Scraper laufen im Hintergrund aus, blockieren aber nicht die Antwort
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"Ingestion of {names} finished in {round(time.monotonic() - batch_start, 3)}s")
+    return results
+
+def collect_data(results, empty_on_error=True):
+    """Flatten run_sources() results into a {source: data} dict"""
+    data = {}
+    for name, result in results.items():
+        if result['data']:
+            data[name] = result['data']
+        elif empty_on_error:
+            data[name] = []
+    return data
+
+def summarize_results(results):
+    """Per-source status report (without payload) for API responses and logs"""
+    import page_fetcher
+    fetch_paths = page_fetcher.get_fetch_paths()
+    return {
+        name: {
+            'ok': result['error'] is None,
+            'error': result['error'],
+            'timed_out': result['timed_out'],
+            'not_modified': result['not_modified'],
+            'duration': result['duration'],
+            'count': len(result['data']) if result['data'] else 0,
+            'fetch_path': fetch_paths.get(name, {}).get('last')
+        }
+        for name, result in results.items()
+    }
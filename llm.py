@@ -0,0 +1,241 @@
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+import llm_cache
+import llm_metrics
+import llm_router
+import providers
+
+# Configuration
+MAX_IN_FLIGHT = int(os.environ.get('LLM_MAX_IN_FLIGHT', 8))  # gleichzeitige Anfragen an die API
+MIN_IN_FLIGHT = 1
+EXECUTOR_WORKERS = int(os.environ.get('LLM_EXECUTOR_WORKERS', MAX_IN_FLIGHT * 2))  # Artikel-Jobs inkl. Download
+RETRIES = int(os.environ.get('LLM_RETRIES', 4))
+REQUEST_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60))
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+LOW_REMAINING_TOKENS = 2000  # darunter bis zum Reset des Token-Fensters pausieren
+
+logger = logging.getLogger('ai_research_hub.llm')
+
+class AdaptiveLimiter:
+    """
+    Bounds the number of in-flight LLM requests. The limit is halved on a
+    429 and grows by one after a full window of successes (AIMD);
+    pause() holds back new requests until a rate-limit window resets.
+    """
+
+    def __init__(self, max_limit, min_limit=1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = max_limit
+        self.in_flight = 0
+        self.successes = 0
+        self.paused_until = 0.0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self.cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def on_success(self):
+        with self.cond:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self.successes = 0
+                self.cond.notify_all()
+
+    def on_rate_limit(self):
+        with self.cond:
+            self.limit = max(self.min_limit, self.limit // 2)
+            self.successes = 0
+            logger.warning(f"Rate limited, LLM concurrency reduced to {self.limit}")
+
+    def pause(self, seconds):
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+_limiter = AdaptiveLimiter(MAX_IN_FLIGHT, MIN_IN_FLIGHT)
+_stats_lock = threading.Lock()
+_stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'failures': 0}
+_rate_headers = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+_pending = {}  # Cache-Schlüssel -> Lock der laufenden Anfrage
+_pending_lock = threading.Lock()
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+def _parse_duration(value):
+    """OpenAI reset headers ('1s', '6m0s', '20ms') in seconds"""
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    return sum(float(amount) * units[unit] for amount, unit in re.findall(r'([\d.]+)(ms|s|m|h)', value or ''))
+
+def _observe_headers(headers):
+    """Remember the rate-limit headers and pause before the budget runs dry"""
+    remaining_requests = headers.get('x-ratelimit-remaining-requests')
+    remaining_tokens = headers.get('x-ratelimit-remaining-tokens')
+    if remaining_requests is None and remaining_tokens is None:
+        return
+    with _stats_lock:
+        _rate_headers.update({
+            'remaining_requests': remaining_requests,
+            'remaining_tokens': remaining_tokens,
+            'reset_requests': headers.get('x-ratelimit-reset-requests'),
+            'reset_tokens': headers.get('x-ratelimit-reset-tokens'),
+        })
+    if remaining_requests is not None and int(remaining_requests) <= 0:
+        _limiter.pause(_parse_duration(headers.get('x-ratelimit-reset-requests')))
+    if remaining_tokens is not None and int(remaining_tokens) < LOW_REMAINING_TOKENS:
+        _limiter.pause(_parse_duration(headers.get('x-ratelimit-reset-tokens')))
+
+def _is_retryable(error):
+    import openai
+    return (isinstance(error, openai.APIConnectionError)
+            or getattr(error, 'status_code', None) in RETRY_STATUS)
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    return response.headers.get('retry-after') if response is not None else None
+
+def _from_cache(cached_json):
+    from openai.types.chat import ChatCompletion
+    return ChatCompletion.model_validate_json(cached_json)
+
+def chat(messages, model=None, task=None, retries=None, cache=True, **params):
+    """
+    Run one chat completion through the shared concurrency limiter.
+    Without an explicit model, llm_router picks one for the task
+    ('classify', 'score', 'summarize', 'chat') and falls back to a faster
+    model while the task's latency or error SLO is broken.
+    429s, 5xx and connection errors are retried with jittered backoff.
+    Identical requests are answered from llm_cache unless cache=False;
+    concurrent identical requests wait for the first one instead of repeating it.
+    Every call is recorded in llm_metrics with tokens, latency, retries and caller.
+    Returns the completion like client.chat.completions.create().
+    """
+    providers.check_backend_state()
+    retries = RETRIES if retries is None else retries
+    model = model or llm_router.select(task)
+    params.setdefault('timeout', REQUEST_TIMEOUT)
+    source, function = llm_metrics.caller()
+    call = {'retries': 0, 'cache_hit': False, 'task': task}
+    start = time.perf_counter()
+    try:
+        completion = _cached_request(messages, model, retries, cache, params, call)
+    except Exception as e:
+        llm_metrics.record(source, function, model, latency=time.perf_counter() - start,
+                           retries=call['retries'], error=e)
+        raise
+    llm_metrics.record(source, function, model, getattr(completion, 'usage', None),
+                       time.perf_counter() - start, call['retries'], call['cache_hit'])
+    return completion
+
+def _cached_request(messages, model, retries, cache, params, call):
+    if not cache:
+        return _request(messages, model, retries, None, params, call)
+
+    key = llm_cache.make_key(model, messages, backend=providers.backend_id(), **params)
+    with _pending_lock:
+        key_lock = _pending.setdefault(key, threading.Lock())
+    with key_lock:
+        try:
+            cached_json = llm_cache.get(key)
+            if cached_json is not None:
+                call['cache_hit'] = True
+                return _from_cache(cached_json)
+            return _request(messages, model, retries, key, params, call)
+        finally:
+            with _pending_lock:
+                _pending.pop(key, None)
+
+def _request(messages, model, retries, key, params, call):
+    client = providers.openai_client()
+
+    for attempt in range(retries + 1):
+        call['retries'] = attempt
+        _limiter.acquire()
+        _count('requests')
+        # Nur die HTTP-Anfrage selbst zählt für das SLO des Modells, nicht Warteschlange und Backoff
+        attempt_start = time.perf_counter()
+        try:
+            raw = client.chat.completions.with_raw_response.create(model=model, messages=messages, **params)
+            llm_router.observe(call['task'], model, time.perf_counter() - attempt_start)
+        except Exception as e:
+            # 429, 5xx und Verbindungsfehler gehen als Fehler des Modells in die Fehlerquote ein
+            if _is_retryable(e):
+                llm_router.observe(call['task'], model, time.perf_counter() - attempt_start, ok=False)
+            if not _is_retryable(e) or attempt >= retries:
+                _count('failures')
+                raise
+            retry_after = _retry_after(e)
+            if getattr(e, 'status_code', None) == 429:
+                _count('rate_limited')
+                _limiter.on_rate_limit()
+                if retry_after:
+                    _limiter.pause(float(retry_after))
+            delay = http_client.backoff_delay(attempt + 1, retry_after)
+            logger.warning(f"LLM request failed ({e}), retry {attempt + 1}/{retries} in {delay:.1f}s")
+        else:
+            _observe_headers(raw.headers)
+            _limiter.on_success()
+            completion = raw.parse()
+            if key:
+                usage = getattr(completion, 'usage', None)
+                llm_cache.put(key, model, completion.model_dump_json(),
+                              getattr(usage, 'total_tokens', 0))
+            return completion
+        finally:
+            _limiter.release()
+
+        _count('retries')
+        time.sleep(delay)
+
+def _mark_worker():
+    _worker.active = True
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix='llm',
+                                           initializer=_mark_worker)
+        return _executor
+
+def run_concurrently(fn, items):
+    """
+    Run fn(item) for all items on the shared LLM executor and return the
+    results in input order. Calls made from an executor thread run inline.
+    """
+    items = list(items)
+    if len(items) <= 1 or getattr(_worker, 'active', False):
+        return [fn(item) for item in items]
+    fn = llm_metrics.bind_caller(fn)
+    futures = [_get_executor().submit(fn, item) for item in items]
+    return [future.result() for future in futures]
+
+def get_stats():
+    """Counters, current concurrency limit, the last rate-limit headers, cache and routing stats"""
+    with _stats_lock:
+        stats = dict(_stats, rate_limit_headers=dict(_rate_headers))
+    stats.update(limit=_limiter.limit, in_flight=_limiter.in_flight, cache=llm_cache.get_stats(),
+                 routing=llm_router.get_stats())
+    return stats
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Configuration
+CACHE_PATH = os.environ.get('LLM_CACHE_PATH', os.path.join('cache', 'llm_cache.db'))
+TTL = float(os.environ.get('LLM_CACHE_TTL', 7 * 86400))  # Sekunden
+MAX_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+EVICT_EVERY = 50  # Schreibvorgänge zwischen zwei Aufräumläufen
+# Parameter, die das Ergebnis nicht beeinflussen und daher nicht in den Schlüssel gehen
+IGNORED_PARAMS = ('timeout',)
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'tokens_saved': 0}
+_writes = 0
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH) or '.', exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT NOT NULL,
+            total_tokens INTEGER DEFAULT 0,
+            size INTEGER NOT NULL,
+            hits INTEGER DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache(created_at)')
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+def make_key(model, messages, backend=None, **params):
+    """
+    SHA-256 over model, messages and generation parameters (temperature, max_tokens, ...).
+    backend (providers.backend_id()) separates answers of other servers from the OpenAI API.
+    """
+    params = {k: v for k, v in params.items() if k not in IGNORED_PARAMS and v is not None}
+    key_data = {'model': model, 'messages': messages, 'params': params}
+    if backend:
+        key_data['backend'] = backend
+    payload = json.dumps(key_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get(key):
+    """Cached response JSON for key, or None if missing or expired"""
+    try:
+        conn = _connect()
+        row = conn.execute('SELECT response, total_tokens, created_at FROM llm_cache WHERE key=?', (key,)).fetchone()
+        if row and time.time() - row[2] < TTL:
+            conn.execute('UPDATE llm_cache SET hits=hits+1, last_used=? WHERE key=?', (time.time(), key))
+            conn.commit()
+            with _stats_lock:
+                _stats['hits'] += 1
+                _stats['tokens_saved'] += row[1] or 0
+            return row[0]
+    except sqlite3.Error as e:
+        logging.warning(f"LLM cache read error: {e}")
+    with _stats_lock:
+        _stats['misses'] += 1
+    return None
+
+def put(key, model, response_json, total_tokens=0):
+    global _writes
+    now = time.time()
+    try:
+        conn = _connect()
+        conn.execute('''
+        INSERT OR REPLACE INTO llm_cache (key, model, response, total_tokens, size, hits, created_at, last_used)
+        VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+        ''', (key, model, response_json, total_tokens or 0, len(response_json.encode('utf-8')), now, now))
+        conn.commit()
+    except sqlite3.Error as e:
+        logging.warning(f"LLM cache write error: {e}")
+        return
+    with _stats_lock:
+        _writes += 1
+        due = _writes % EVICT_EVERY == 1
+    if due:
+        evict()
+
+def evict():
+    """Drop expired entries, then least recently used ones until the cache fits MAX_BYTES"""
+    try:
+        conn = _connect()
+        expired = conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (time.time() - TTL,)).rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        removed = 0
+        if total > MAX_BYTES:
+            for key, size in conn.execute('SELECT key, size FROM llm_cache ORDER BY last_used').fetchall():
+                if total <= MAX_BYTES:
+                    break
+                conn.execute('DELETE FROM llm_cache WHERE key=?', (key,))
+                total -= size
+                removed += 1
+        conn.commit()
+        if expired or removed:
+            logging.info(f"LLM cache: {expired} expired, {removed} evicted, {total} bytes left")
+    except sqlite3.Error as e:
+        logging.warning(f"LLM cache eviction error: {e}")
+
+def get_stats():
+    """Hit rate and tokens saved in this process, plus totals over the stored entries"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    try:
+        entries, size, hits, saved = _connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * total_tokens), 0) FROM llm_cache'
+        ).fetchone()
+        stats.update(entries=entries, bytes=size, total_hits=hits, total_tokens_saved=saved)
+    except sqlite3.Error as e:
+        logging.warning(f"LLM cache stats error: {e}")
+    return stats
@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+
+# Configuration
+METRICS_PATH = os.environ.get('LLM_METRICS_PATH', os.path.join('cache', 'llm_metrics.db'))
+RETENTION_DAYS = int(os.environ.get('LLM_METRICS_RETENTION_DAYS', 30))
+# USD pro 1K Tokens (Prompt, Completion); unbekannte Modelle werden mit 0 verbucht
+PRICES = {
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4-turbo': (0.01, 0.03),
+}
+# Module, die nur durchreichen und nie Aufrufer sind
+INTERNAL_MODULES = {'llm', 'llm_metrics', 'llm_cache', 'threading', 'concurrent.futures.thread'}
+# Quelle eines Aufrufs = erstes Modul im Stack, das hier auftaucht
+SOURCE_MODULES = {
+    'arxiv_scraper': 'arxiv', 'techcrunch': 'techcrunch', 'venture_beat': 'venturebeat',
+    'stanford_ai': 'stanford', 'theverge': 'theverge', 'thn': 'thehackernews',
+    'app': 'app', 'web_app': 'web_app', '__main__': 'main',
+}
+
+_local = threading.local()
+_retention_done = set()
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(os.path.dirname(METRICS_PATH) or '.', exist_ok=True)
+        conn = sqlite3.connect(METRICS_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL,
+            source TEXT,
+            function TEXT,
+            model TEXT,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            latency REAL,
+            retries INTEGER DEFAULT 0,
+            cache_hit INTEGER DEFAULT 0,
+            cost REAL DEFAULT 0,
+            error TEXT
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls(created_at)')
+        if METRICS_PATH not in _retention_done:
+            conn.execute('DELETE FROM llm_calls WHERE created_at < ?', (time.time() - RETENTION_DAYS * 86400,))
+            _retention_done.add(METRICS_PATH)
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+def caller():
+    """(source, 'module.function') of the code that triggered the current LLM call"""
+    source = getattr(_local, 'source', None)
+    function = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module not in INTERNAL_MODULES:
+            if function is None:
+                function = f"{module}.{frame.f_code.co_name}"
+            if module in SOURCE_MODULES:
+                source = SOURCE_MODULES[module]
+                break
+        frame = frame.f_back
+    return source or 'unknown', function or 'unknown'
+
+def bind_caller(fn):
+    """Wrap fn for another thread so its LLM calls keep the submitting caller's source"""
+    source, _ = caller()
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, 'source', None)
+        _local.source = source
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.source = previous
+    return run
+
+def cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = next(
+        (price for name, price in sorted(PRICES.items(), key=lambda p: -len(p[0])) if (model or '').startswith(name)),
+        (0.0, 0.0)
+    )
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+def record(source, function, model, usage=None, latency=0.0, retries=0, cache_hit=False, error=None):
+    """Store one LLM call; cache hits are stored with their tokens but no cost"""
+    prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+    completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+    try:
+        conn = _connect()
+        conn.execute('''
+        INSERT INTO llm_calls
+        (created_at, source, function, model, prompt_tokens, completion_tokens, latency, retries, cache_hit, cost, error)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (time.time(), source, function, model, prompt_tokens, completion_tokens, round(latency, 4), retries,
+              int(cache_hit), 0.0 if cache_hit else cost(model, prompt_tokens, completion_tokens),
+              str(error)[:500] if error else None))
+        conn.commit()
+    except sqlite3.Error as e:
+        logging.warning(f"LLM metrics write error: {e}")
+
+def get_aggregates(group_by='source', hours=None):
+    """Calls, tokens, cost, latency, retries and cache hits per source, function or model"""
+    if group_by not in ('source', 'function', 'model'):
+        raise ValueError(f"Cannot group LLM metrics by {group_by}")
+    query = f'''
+    SELECT {group_by}, COUNT(*), SUM(cache_hit), SUM(error IS NOT NULL),
+           SUM(prompt_tokens), SUM(completion_tokens), SUM(cost),
+           AVG(CASE WHEN cache_hit = 0 THEN latency END), MAX(latency), SUM(latency), SUM(retries)
+    FROM llm_calls
+    '''
+    params = []
+    if hours:
+        query += ' WHERE created_at >= ?'
+        params.append(time.time() - hours * 3600)
+    query += f' GROUP BY {group_by} ORDER BY SUM(prompt_tokens + completion_tokens) DESC'
+    try:
+        rows = _connect().execute(query, params).fetchall()
+    except sqlite3.Error as e:
+        logging.warning(f"LLM metrics read error: {e}")
+        return {}
+    return {
+        key: {
+            'calls': calls, 'cache_hits': hits, 'errors': errors,
+            'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+            'cost_usd': round(total_cost or 0, 4), 'avg_latency': round(avg_latency or 0, 3),
+            'max_latency': round(max_latency or 0, 3), 'total_seconds': round(total_latency or 0, 1),
+            'retries': retries,
+        }
+        for key, calls, hits, errors, prompt_tokens, completion_tokens, total_cost,
+            avg_latency, max_latency, total_latency, retries in rows
+    }
@@ -0,0 +1,91 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+# Modelle pro Aufgabe: erstes = Standard, weitere = schnellere Ausweichmodelle bei SLO-Verletzung
+TASK_MODELS = {
+    'classify': [os.environ.get('LLM_MODEL_CLASSIFY', 'gpt-4o-mini'), 'gpt-3.5-turbo'],
+    'score': [os.environ.get('LLM_MODEL_SCORE', 'gpt-4o-mini'), 'gpt-3.5-turbo'],
+    'summarize': [os.environ.get('LLM_MODEL_SUMMARIZE', 'gpt-3.5-turbo'), 'gpt-4o-mini'],
+    'chat': [os.environ.get('LLM_MODEL_CHAT', os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')), 'gpt-4o-mini'],
+}
+DEFAULT_TASK = 'summarize'
+# Latenz-SLO (p95, Sekunden) und maximale Fehlerquote pro Aufgabe
+TASK_SLOS = {
+    'classify': {'p95': 3.0, 'error_rate': 0.2},
+    'score': {'p95': 3.0, 'error_rate': 0.2},
+    'summarize': {'p95': 20.0, 'error_rate': 0.2},
+    'chat': {'p95': 15.0, 'error_rate': 0.2},
+}
+WINDOW = 50        # letzte Aufrufe pro Aufgabe und Modell
+MIN_SAMPLES = 10   # darunter wird kein SLO bewertet
+COOLDOWN = float(os.environ.get('LLM_ROUTING_COOLDOWN', 120))  # Sekunden auf dem Ausweichmodell
+
+logger = logging.getLogger('ai_research_hub.llm')
+
+_lock = threading.Lock()
+_samples = {}         # (task, model) -> deque[(latency, ok)]
+_degraded_until = {}  # (task, model) -> monotonic time
+
+def _p95(latencies):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+def _window_stats(task, model):
+    samples = _samples.get((task, model))
+    if not samples:
+        return None, None, 0
+    latencies = [latency for latency, ok in samples if ok]
+    error_rate = sum(1 for _, ok in samples if not ok) / len(samples)
+    return (_p95(latencies) if latencies else None), error_rate, len(samples)
+
+def select(task=None):
+    """Model for a task: the first candidate that is not in an SLO cooldown"""
+    task = task if task in TASK_MODELS else DEFAULT_TASK
+    candidates = TASK_MODELS[task]
+    now = time.monotonic()
+    with _lock:
+        for model in candidates:
+            if _degraded_until.get((task, model), 0) <= now:
+                return model
+    return candidates[-1]
+
+def observe(task, model, latency, ok=True):
+    """Record a finished call; moves the task off a model whose p95 or error rate breaks the SLO"""
+    task = task if task in TASK_MODELS else DEFAULT_TASK
+    slo = TASK_SLOS.get(task)
+    key = (task, model)
+    with _lock:
+        samples = _samples.setdefault(key, deque(maxlen=WINDOW))
+        samples.append((latency, ok))
+        if not slo or len(samples) < MIN_SAMPLES or _degraded_until.get(key, 0) > time.monotonic():
+            return
+        p95, error_rate, _ = _window_stats(task, model)
+        if (p95 is not None and p95 > slo['p95']) or error_rate > slo['error_rate']:
+            _degraded_until[key] = time.monotonic() + COOLDOWN
+            # Nach der Pause startet das Modell mit frischen Messwerten
+            samples.clear()
+            logger.warning(f"{task}: {model} breaks SLO (p95 {p95 or 0:.2f}s, errors {error_rate:.0%}), "
+                           f"falling back for {COOLDOWN:.0f}s")
+
+def get_stats():
+    """Current model, p95 latency and error rate per task and model"""
+    now = time.monotonic()
+    stats = {}
+    with _lock:
+        for task, candidates in TASK_MODELS.items():
+            models = {}
+            for model in candidates:
+                p95, error_rate, samples = _window_stats(task, model)
+                models[model] = {
+                    'p95': round(p95, 3) if p95 is not None else None,
+                    'error_rate': round(error_rate, 3) if error_rate is not None else None,
+                    'samples': samples,
+                    'degraded_for': round(max(0.0, _degraded_until.get((task, model), 0) - now), 1),
+                }
+            stats[task] = {'slo': TASK_SLOS.get(task), 'models': models}
+    for task in stats:
+        stats[task]['active'] = select(task)
+    return stats
@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Configuration (auch per Kommandozeile)
+HOST = os.environ.get('MOCK_LLM_HOST', '127.0.0.1')
+PORT = int(os.environ.get('MOCK_LLM_PORT', 8089))
+LATENCY = float(os.environ.get('MOCK_LLM_LATENCY', 0.5))         # Sekunden pro Antwort
+LATENCY_PER_TOKEN = float(os.environ.get('MOCK_LLM_LATENCY_PER_TOKEN', 0.0))  # zusätzlich pro Completion-Token
+ERROR_RATE = float(os.environ.get('MOCK_LLM_ERROR_RATE', 0.0))   # Anteil fehlerhafter Antworten
+ERROR_STATUS = int(os.environ.get('MOCK_LLM_ERROR_STATUS', 429))
+SEED = int(os.environ.get('MOCK_LLM_SEED', 0))
+
+class MockState:
+    """Settings and counters shared by all request threads of one server"""
+
+    def __init__(self, latency=LATENCY, latency_per_token=LATENCY_PER_TOKEN, error_rate=ERROR_RATE,
+                 error_status=ERROR_STATUS, seed=SEED):
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+    def fail_next(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def enter(self):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+
+    def leave(self, error=False):
+        with self.lock:
+            self.stats['in_flight'] -= 1
+            self.stats['errors'] += int(error)
+
+def _count_tokens(text):
+    return len(re.findall(r'\w+|[^\w\s]', text or ''))
+
+def _words(text, limit):
+    return ' '.join((text or '').split()[:limit])
+
+def respond(body):
+    """Deterministic reply for a chat request: same messages, same answer"""
+    messages = body.get('messages', [])
+    prompt = messages[-1].get('content', '') if messages else ''
+    text = prompt.split('\n\n', 1)[-1]  # Artikeltext ohne Anweisung
+    digest = int(hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest(), 16)
+    max_words = max(1, int(body.get('max_tokens') or 300) * 3 // 4)
+
+    if (body.get('response_format') or {}).get('type') == 'json_object':
+        words = re.findall(r'[A-Za-z]{5,}', text)
+        content = json.dumps({
+            'is_ai': digest % 4 != 0,
+            'relevance': round((digest % 101) / 100, 2),
+            'keywords': sorted(set(w.lower() for w in words))[:5],
+            'summary': _words(text, min(max_words, 60)),
+        })
+    elif "'Yes' or 'No'" in prompt:
+        content = 'Yes' if digest % 4 != 0 else 'No'
+    elif 'single decimal number' in prompt:
+        content = f"{(digest % 101) / 100:.2f}"
+    else:
+        content = f"Summary: {_words(text, min(max_words, 80))}"
+
+    prompt_tokens = sum(_count_tokens(m.get('content', '')) for m in messages)
+    completion_tokens = _count_tokens(content)
+    return {
+        'id': f"chatcmpl-mock-{digest % 10 ** 12}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'mock'),
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens},
+    }
+
+class MockHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible /v1/chat/completions with configurable latency and errors"""
+
+    server_version = 'MockLLM/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        state = self.server.state
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'gpt-3.5-turbo', 'object': 'model'}]})
+        elif self.path.rstrip('/') == '/stats':
+            with state.lock:
+                self._send_json(200, dict(state.stats))
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        state = self.server.state
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        state.enter()
+        failed = state.fail_next()
+        try:
+            if failed:
+                time.sleep(state.latency / 2)
+                self._send_json(state.error_status, {'error': {'message': 'Mock error', 'type': 'mock_error'}},
+                                {'retry-after': '0.1'} if state.error_status == 429 else None)
+                return
+            response = respond(body)
+            time.sleep(state.latency + state.latency_per_token * response['usage']['completion_tokens'])
+            self._send_json(200, response, {
+                'x-ratelimit-remaining-requests': '10000',
+                'x-ratelimit-remaining-tokens': '1000000',
+                'x-ratelimit-reset-requests': '1s',
+                'x-ratelimit-reset-tokens': '1s',
+            })
+        finally:
+            state.leave(failed)
+
+def start(host=HOST, port=PORT, **settings):
+    """Start the mock server in a daemon thread; port=0 picks a free port. Returns the server."""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.state = MockState(**settings)
+    server.url = f"http://{host}:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def benchmark(requests=100, **settings):
+    """
+    Run requests distinct chat calls through llm.chat() against an in-process
+    mock server. Metrics go to a temporary directory, not cache/llm_metrics.db.
+    """
+    import tempfile
+    import llm
+    import llm_metrics
+    import providers
+    llm_metrics.METRICS_PATH = os.path.join(tempfile.mkdtemp(prefix='mock-bench-'), 'llm_metrics.db')
+    server = start(port=0, **settings)
+    providers.register_backend('mock-bench', lambda: {'api_key': 'mock', 'base_url': server.url})
+    providers.use_backend('mock-bench', isolated=True)
+    try:
+        start_time = time.perf_counter()
+        llm.run_concurrently(
+            lambda i: llm.chat([{'role': 'user', 'content': f"Summarize benchmark document {i}."}], cache=False),
+            range(requests)
+        )
+        elapsed = time.perf_counter() - start_time
+    finally:
+        server.shutdown()
+    return {
+        'requests': requests,
+        'seconds': round(elapsed, 2),
+        'throughput': round(requests / elapsed, 1),
+        'server': dict(server.state.stats),
+        'llm': llm.get_stats(),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='OpenAI-compatible mock server for offline benchmarks')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--latency', type=float, default=LATENCY)
+    parser.add_argument('--latency-per-token', type=float, default=LATENCY_PER_TOKEN)
+    parser.add_argument('--error-rate', type=float, default=ERROR_RATE)
+    parser.add_argument('--error-status', type=int, default=ERROR_STATUS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--bench', type=int, metavar='N', help='run N calls through llm.chat() and exit')
+    args = parser.parse_args()
+
+    settings = dict(latency=args.latency, latency_per_token=args.latency_per_token,
+                    error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    if args.bench:
+        print(json.dumps(benchmark(args.bench, **settings), indent=2))
+    else:
+        server = start(args.host, args.port, **settings)
+        print(f"🧪 Mock LLM server on {server.url} (latency {args.latency}s, error rate {args.error_rate})")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,56 @@
+import logging
+import threading
+from urllib.parse import urljoin
+import feedparser
+from bs4 import BeautifulSoup
+import http_client
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml')
+
+# Welcher Weg (static, feed, browser) pro Quelle genommen wurde
+_paths_lock = threading.Lock()
+_fetch_paths = {}
+
+def record_path(source, path):
+    """Remember which extraction path a source used"""
+    with _paths_lock:
+        stats = _fetch_paths.setdefault(source, {'static': 0, 'feed': 0, 'browser': 0, 'last': None})
+        stats[path] += 1
+        stats['last'] = path
+    logging.info(f"{source}: used {path} path")
+
+def get_fetch_paths():
+    """Per-source counters of the extraction paths used so far"""
+    with _paths_lock:
+        return {source: dict(stats) for source, stats in _fetch_paths.items()}
+
+def fetch_static_html(url):
+    """Plain HTTP fetch; returns the HTML or None on failure"""
+    try:
+        response = http_client.get(url)
+        if response.status_code != 200:
+            logging.warning(f"Static fetch of {url} returned {response.status_code}")
+            return None
+        return response.text
+    except Exception as e:
+        logging.warning(f"Static fetch of {url} failed: {e}")
+        return None
+
+def discover_feed(html, base_url):
+    """Return the first RSS/Atom feed URL advertised in the page head, if any"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for link in soup.find_all('link', rel='alternate'):
+        if link.get('type') in FEED_TYPES and link.get('href'):
+            return urljoin(base_url, link['href'])
+    return None
+
+def fetch_feed_entries(feed_url):
+    """Fetch and parse a feed; returns its entries or an empty list"""
+    try:
+        response = http_client.get(feed_url)
+        if response.status_code != 200:
+            return []
+        return feedparser.parse(response.content).entries
+    except Exception as e:
+        logging.warning(f"Feed fetch of {feed_url} failed: {e}")
+        return []
@@ -0,0 +1,95 @@
+import os
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+
+# Configuration
+MAX_WORKERS = int(os.environ.get('PDF_DOWNLOAD_WORKERS', 4))
+PER_HOST_LIMIT = int(os.environ.get('PDF_DOWNLOAD_PER_HOST', 2))
+RETRIES = 3
+CHUNK_SIZE = 256 * 1024
+PART_SUFFIX = '.part'
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+def _host_slot(url):
+    host = urlparse(url).hostname or ''
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_slots[host]
+
+def _fetch_to_part(url, part_path):
+    """Download url into part_path, resuming from its current size via a Range request"""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+    # Transport-Retries übernimmt download(), daher retries=0
+    with http_client.get(url, headers=headers, stream=True, retries=0) as response:
+        if response.status_code == 416:
+            # Teil-Datei ist bereits vollständig
+            return
+        if response.status_code == 206:
+            mode = 'ab'
+        else:
+            response.raise_for_status()
+            mode = 'wb'  # Server ignoriert Range: von vorne beginnen
+
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and 'application/pdf' not in content_type:
+            raise ValueError("URL doesn't point to PDF content")
+
+        if offset and mode == 'ab':
+            logging.info(f"Resuming {os.path.basename(part_path)} at byte {offset}")
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+
+def download(url, filepath, validate=None, retries=RETRIES):
+    """
+    Download url to filepath via a temporary .part file.
+    Partial downloads are resumed with HTTP Range requests; the file is
+    only renamed into place once validate(part_path) passes.
+    Returns filepath or None.
+    """
+    if os.path.exists(filepath):
+        logging.info(f"Skipping existing: {os.path.basename(filepath)}")
+        return filepath
+
+    part_path = filepath + PART_SUFFIX
+    for attempt in range(retries):
+        try:
+            with _host_slot(url):
+                _fetch_to_part(url, part_path)
+
+            if validate and not validate(part_path):
+                os.remove(part_path)
+                raise ValueError("Invalid PDF structure")
+
+            os.replace(part_path, filepath)
+            return filepath
+
+        except Exception as e:
+            logging.warning(f"Attempt {attempt+1} for {url} failed: {str(e)}")
+            if attempt < retries - 1:
+                time.sleep(http_client.backoff_delay(attempt + 1))
+
+    logging.error(f"Failed to download {url} after {retries} attempts")
+    return None
+
+def download_all(jobs, validate=None, max_workers=None):
+    """
+    Download several files concurrently.
+    jobs is a list of (key, url, filepath); returns {key: filepath or None}.
+    """
+    if not jobs:
+        return {}
+    workers = max(1, min(max_workers or MAX_WORKERS, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf') as executor:
+        futures = {key: executor.submit(download, url, filepath, validate) for key, url, filepath in jobs}
+    return {key: future.result() for key, future in futures.items()}
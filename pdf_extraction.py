@@ -0,0 +1,223 @@
+import os
+import re
+import atexit
+import hashlib
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PyPDF2 import PdfReader
+import pdfplumber
+
+# Configuration
+TEXT_CACHE_DIR = os.path.join('cache', 'pdf_text')
+MAX_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', os.cpu_count() or 2))
+FRONT_PAGES = 4  # Seiten, in denen Abstract/Introduction gesucht werden
+TAIL_PAGES = 6   # Seiten vom Ende, in denen die Conclusion gesucht wird
+
+# Überschriften der Abschnitte, die für Zusammenfassungen am meisten taugen
+SECTION_PATTERNS = {
+    'abstract': r'^[ \t]*abstract\b[ \t.:—-]*',
+    # Nummer darf direkt an der vorherigen Zeile kleben ("...advising1. Introduction")
+    'introduction': r'(?:^[ \t]*(?:\d+\.?|[IVX]+\.)?|\d\.?)[ \t]*introduction[ \t.:]*$',
+    'conclusion': r'(?:^[ \t]*(?:\d+\.?|[IVX]+\.)?|\d\.?)[ \t]*(?:conclusions?|concluding remarks|discussion and conclusions?)\b[^\n]{0,40}$',
+}
+FRONT_SECTIONS = ('abstract', 'introduction')
+# Nächste nummerierte Überschrift oder Literaturverzeichnis beendet einen Abschnitt
+NEXT_HEADING_PATTERN = re.compile(r'^[ \t]*(?:(?:\d+(?:\.\d+)*\.?|[IVX]+\.)[ \t]+[A-Z][^\n]{0,80}|references|bibliography|acknowledge?ments?)[ \t]*$', re.M | re.I)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def _budget_key(max_chars=None, max_pages=None, sections=None):
+    if not (max_chars or max_pages or sections):
+        return ''
+    return f".c{max_chars or 0}-p{max_pages or 0}-{'+'.join(sections or ['head'])}"
+
+def _cache_path(sha, budget_key=''):
+    return os.path.join(TEXT_CACHE_DIR, f"{sha}{budget_key}.txt")
+
+def get_cached_text(sha, budget_key=''):
+    path = _cache_path(sha, budget_key)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            logging.warning(f"PDF text cache read error: {e}")
+    return None
+
+def save_cached_text(sha, text, budget_key=''):
+    os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+    path = _cache_path(sha, budget_key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logging.warning(f"PDF text cache write error: {e}")
+
+@contextmanager
+def _pypdf2_pages(pdf_path):
+    with open(pdf_path, 'rb') as f:
+        reader = PdfReader(f)
+        yield len(reader.pages), lambda i: reader.pages[i].extract_text() or ''
+
+@contextmanager
+def _pdfplumber_pages(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        yield len(pdf.pages), lambda i: pdf.pages[i].extract_text() or ''
+
+def find_section(text, name, max_chars=None):
+    """Return the body of a named section (see SECTION_PATTERNS) or None"""
+    match = re.search(SECTION_PATTERNS[name], text, re.M | re.I)
+    if not match:
+        return None
+    body = text[match.end():]
+    end = NEXT_HEADING_PATTERN.search(body, 1)
+    if end:
+        body = body[:end.start()]
+    body = body.strip()
+    return body[:max_chars] if max_chars else body
+
+def select_sections(text, sections, max_chars=None):
+    """Join the requested sections, sharing max_chars between the ones found"""
+    bodies = {name: find_section(text, name) for name in sections}
+    found = [name for name in sections if bodies[name]]
+    if not found:
+        # Keine Überschriften erkannt: Textanfang verwenden
+        return text[:max_chars] if max_chars else text
+
+    if max_chars:
+        # Überschriften ("Abstract:\n") und Trenner zählen mit zum Budget
+        budget = max(0, max_chars - sum(len(f"{name.capitalize()}:\n") for name in found) - 2 * (len(found) - 1))
+        # Kurze Abschnitte zuerst, ungenutztes Budget geht an die längeren
+        for i, name in enumerate(sorted(found, key=lambda n: len(bodies[n]))):
+            bodies[name] = bodies[name][:budget // (len(found) - i)]
+            budget -= len(bodies[name])
+
+    return '\n\n'.join(f"{name.capitalize()}:\n{bodies[name]}" for name in found)
+
+def _read_pages(page_count, page_text, max_chars=None, max_pages=None, sections=None):
+    limit = min(page_count, max_pages) if max_pages else page_count
+
+    if not sections:
+        parts, size = [], 0
+        for i in range(limit):
+            parts.append(page_text(i))
+            size += len(parts[-1])
+            if max_chars and size >= max_chars:
+                break
+        text = '\n'.join(parts)
+        return text[:max_chars] if max_chars else text
+
+    # Vorne nur so viele Seiten lesen, bis Abstract/Introduction gefunden sind
+    front_targets = [name for name in sections if name in FRONT_SECTIONS]
+    per_section = max_chars // len(sections) if max_chars else None
+    front = []
+    for i in range(min(limit, FRONT_PAGES)):
+        front.append(page_text(i))
+        text = '\n'.join(front)
+        if all(find_section(text, name) and (not per_section or len(find_section(text, name)) >= per_section)
+               for name in front_targets):
+            break
+
+    # Conclusion rückwärts vom Dokumentende suchen
+    tail = []
+    if 'conclusion' in sections:
+        for i in range(limit - 1, max(len(front), limit - TAIL_PAGES) - 1, -1):
+            tail.insert(0, page_text(i))
+            if re.search(SECTION_PATTERNS['conclusion'], tail[0], re.M | re.I):
+                break
+
+    return select_sections('\n'.join(front + tail), sections, max_chars)
+
+def extract_pdf_text(pdf_path, max_chars=None, max_pages=None, sections=None):
+    """
+    Extract text with PyPDF2, falling back to pdfplumber. Runs in a worker process.
+    With max_chars/max_pages, reading stops as soon as the budget is reached;
+    sections (e.g. ['abstract', 'introduction', 'conclusion']) limits the
+    output to those parts of the paper.
+    """
+    for name, open_pages in (('PyPDF2', _pypdf2_pages), ('pdfplumber', _pdfplumber_pages)):
+        try:
+            with open_pages(pdf_path) as (page_count, page_text):
+                text = _read_pages(page_count, page_text, max_chars, max_pages, sections)
+            if text.strip():
+                return text
+        except Exception as e:
+            logging.warning(f"{name} failed: {str(e)}")
+    return None
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn statt fork: der Elternprozess hat Flask-, Ingestion- und LLM-Threads,
+            # deren Locks (z.B. logging) im geforkten Kind gesperrt bleiben könnten
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def extract_texts(pdf_paths, max_chars=None, max_pages=None, sections=None):
+    """
+    Extract the text of several PDFs in a process pool.
+    Text is cached by the PDF's SHA-256 (and budget), so a known PDF is never
+    parsed twice. Budget arguments as in extract_pdf_text().
+    Returns {pdf_path: text or None}.
+    """
+    budget_key = _budget_key(max_chars, max_pages, sections)
+    results = {}
+    pending = {}
+    for path in dict.fromkeys(pdf_paths):
+        sha = file_sha256(path)
+        text = get_cached_text(sha, budget_key)
+        if text is None and budget_key and not max_pages:
+            # Vollständiger Text liegt schon vor: Budget direkt darauf anwenden
+            full_text = get_cached_text(sha)
+            if full_text is not None:
+                text = select_sections(full_text, sections, max_chars) if sections else full_text[:max_chars]
+        if text is not None:
+            logging.info(f"PDF text cache hit for {os.path.basename(path)}")
+            results[path] = text
+        else:
+            pending[path] = sha
+
+    if pending:
+        try:
+            pool = _get_pool()
+            futures = {path: pool.submit(extract_pdf_text, path, max_chars, max_pages, sections) for path in pending}
+            texts = {path: future.result() for path, future in futures.items()}
+        except BrokenProcessPool as e:
+            logging.warning(f"PDF process pool failed ({e}), extracting in-process")
+            _reset_pool()
+            texts = {path: extract_pdf_text(path, max_chars, max_pages, sections) for path in pending}
+
+        for path, text in texts.items():
+            if text:
+                save_cached_text(pending[path], text, budget_key)
+            results[path] = text
+
+    return results
+
+def extract_text(pdf_path, max_chars=None, max_pages=None, sections=None):
+    """Cached text of a single PDF (see extract_texts())"""
+    return extract_texts([pdf_path], max_chars, max_pages, sections).get(pdf_path)
+
+atexit.register(_reset_pool)
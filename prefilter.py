@@ -0,0 +1,154 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+import relevance
+
+# Entscheidungen des lokalen Vorfilters
+SKIP = 'skip'            # kein LLM-Aufruf
+SUMMARIZE = 'summarize'  # normale Verarbeitung
+DEEP = 'deep'            # eindeutig KI-bezogen: ausführliche Analyse, Ja/Nein-Check entfällt
+DECISIONS = (SKIP, SUMMARIZE, DEEP)
+
+ENABLED = os.environ.get('PREFILTER_ENABLED', '1') != '0'
+
+# Schwellen auf der Skala von relevance.calculate_keyword_score (0-1). Eine einzelne
+# Erwähnung eines Keywords im Fließtext liegt bei ~0.05-0.1, im Titel/Anfang bei ~0.1-0.15;
+# ab ~0.4 stehen mehrere gewichtige Begriffe schon im Titel oder Anfang.
+# Übersprungen wird nur ohne jeden Keyword-Treffer (Score 0): schon ein einzelnes "AI" im
+# Text geht an den günstigen LLM-Check. Anheben erst nach Messung mit calibrate().
+THRESHOLDS = {
+    SUMMARIZE: float(os.environ.get('PREFILTER_SUMMARIZE_FROM', 0.01)),
+    DEEP: float(os.environ.get('PREFILTER_DEEP_FROM', 0.4)),
+}
+# Abweichende Schwellen pro Quelle
+SOURCE_THRESHOLDS = {
+    'relevance': {SUMMARIZE: 0.2, DEEP: 0.4},  # bisheriger Short-Circuit in analyze_relevance
+}
+EXTRA_KEYWORD_BONUS = 0.05  # pro Treffer aus der Keyword-Liste der Quelle (ganze Wörter)
+MAX_EXTRA_BONUS = 0.2
+
+LOG_FILE = os.environ.get('PREFILTER_LOG', os.path.join('cache', 'prefilter_decisions.jsonl'))
+
+_lock = threading.Lock()
+_stats = defaultdict(lambda: {SKIP: 0, SUMMARIZE: 0, DEEP: 0, 'calls_saved': 0})
+
+def score(text, title='', extra_keywords=None):
+    """Fast local relevance score (keyword weights only, no spaCy, no API)"""
+    content = f"{title}\n{text or ''}"
+    value = relevance.calculate_keyword_score(content, use_entities=False)
+    if extra_keywords:
+        hits = sum(1 for kw in extra_keywords
+                   if re.search(rf'\b{re.escape(kw)}\b', content, re.IGNORECASE))
+        value += min(MAX_EXTRA_BONUS, hits * EXTRA_KEYWORD_BONUS)
+    return min(1.0, value)
+
+def classify(value, source=None):
+    """Map a keyword score to skip, summarize or deep using the source's thresholds"""
+    if not ENABLED:
+        return SUMMARIZE
+    thresholds = SOURCE_THRESHOLDS.get(source, THRESHOLDS)
+    if value >= thresholds[DEEP]:
+        return DEEP
+    if value >= thresholds[SUMMARIZE]:
+        return SUMMARIZE
+    return SKIP
+
+def decide(text, source, title='', link='', extra_keywords=None, saves=None):
+    """
+    Score an article locally, pick skip/summarize/deep and record the decision.
+    saves maps a decision to the number of LLM calls it avoids (default: skip saves one).
+    """
+    value = score(text, title, extra_keywords)
+    decision = classify(value, source)
+    record(source, decision, value, (saves or {SKIP: 1}).get(decision, 0), title, link)
+    return decision
+
+def record(source, decision, value, calls_saved=0, title='', link=''):
+    """Count a gate decision and append it to the decision log"""
+    entry = {
+        'time': time.time(), 'source': source, 'decision': decision,
+        'score': round(value, 3), 'calls_saved': calls_saved, 'title': title, 'link': link
+    }
+    with _lock:
+        _stats[source][decision] += 1
+        _stats[source]['calls_saved'] += calls_saved
+        try:
+            os.makedirs(os.path.dirname(LOG_FILE) or '.', exist_ok=True)
+            with open(LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logging.warning(f"Prefilter log write error: {e}")
+
+def record_outcome(source, value, is_ai, title='', link=''):
+    """Log the LLM verdict for an article the prefilter let through (input for calibrate())"""
+    entry = {
+        'time': time.time(), 'source': source, 'outcome': bool(is_ai),
+        'score': round(value, 3), 'title': title, 'link': link
+    }
+    with _lock:
+        try:
+            os.makedirs(os.path.dirname(LOG_FILE) or '.', exist_ok=True)
+            with open(LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logging.warning(f"Prefilter log write error: {e}")
+
+def calibrate(path=None, thresholds=(0.01, 0.05, 0.1, 0.15, 0.2, 0.3)):
+    """
+    Measure skip thresholds against the LLM verdicts in the decision log.
+    Per source and threshold: AI articles that would have been skipped (lost)
+    and non-AI articles whose LLM call would have been saved.
+    """
+    outcomes = defaultdict(list)
+    try:
+        with open(path or LOG_FILE, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'outcome' in entry:
+                    outcomes[entry.get('source')].append((entry['score'], entry['outcome']))
+    except FileNotFoundError:
+        pass
+    report = {}
+    for source, rows in outcomes.items():
+        ai_total = sum(1 for _, is_ai in rows if is_ai)
+        report[source] = {'articles': len(rows), 'ai': ai_total, 'thresholds': {
+            threshold: {
+                'lost_ai': sum(1 for value, is_ai in rows if is_ai and value < threshold),
+                'saved_calls': sum(1 for value, is_ai in rows if not is_ai and value < threshold),
+            }
+            for threshold in thresholds
+        }}
+    return report
+
+def get_stats():
+    """Decisions and saved LLM calls per source in this process"""
+    with _lock:
+        return {source: dict(counts) for source, counts in _stats.items()}
+
+def load_log_stats(path=None):
+    """Aggregate the decision log over all runs, per source"""
+    totals = defaultdict(lambda: {SKIP: 0, SUMMARIZE: 0, DEEP: 0, 'calls_saved': 0})
+    try:
+        with open(path or LOG_FILE, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                counts = totals[entry.get('source')]
+                if entry.get('decision') in DECISIONS:
+                    counts[entry['decision']] += 1
+                counts['calls_saved'] += entry.get('calls_saved', 0)
+    except FileNotFoundError:
+        pass
+    for counts in totals.values():
+        decided = sum(counts[d] for d in DECISIONS)
+        counts['skip_rate'] = round(counts[SKIP] / decided, 3) if decided else 0.0
+    return dict(totals)
@@ -0,0 +1,174 @@
+import os
+import re
+import time
+import logging
+import importlib
+import threading
+
+# Module der Scraper pro Quelle; werden erst beim ersten Gebrauch importiert
+SCRAPER_MODULES = {
+    'arxiv': 'arxiv_scraper',
+    'techcrunch': 'techcrunch',
+    'venturebeat': 'venture_beat',
+    'stanford': 'stanford_ai',
+    'theverge': 'theverge',
+    'thehackernews': 'thn',
+}
+SPACY_MODEL = 'en_core_web_sm'
+TOKENIZER_ENCODING = 'cl100k_base'  # gpt-3.5-turbo / gpt-4
+# LLM-Backend: 'openai' (gehostete API oder LLM_BASE_URL) oder 'mock' (mock_llm_server.py)
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+MOCK_LLM_URL = os.environ.get('MOCK_LLM_URL', 'http://127.0.0.1:8089/v1')
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_factories = {}
+_instances = {}
+_locks = {}
+_registry_lock = threading.Lock()
+_load_times = {}
+_backend_isolated = False
+
+def register(name, factory):
+    """Register a zero-argument factory that builds the provider on first use"""
+    with _registry_lock:
+        _factories[name] = factory
+        _locks.setdefault(name, threading.Lock())
+
+def get(name):
+    """Return the provider, building it exactly once even under concurrent access"""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _registry_lock:
+        if name not in _factories:
+            raise KeyError(f"Unknown provider: {name}")
+        lock = _locks[name]
+
+    with lock:
+        instance = _instances.get(name)
+        if instance is None:
+            start = time.perf_counter()
+            instance = _factories[name]()
+            _load_times[name] = round(time.perf_counter() - start, 4)
+            _instances[name] = instance
+            logging.info(f"Provider {name} loaded in {_load_times[name]}s")
+    return instance
+
+def reset(name):
+    """Drop a built provider so the next get() rebuilds it (e.g. after a key change)"""
+    with _locks.get(name, _registry_lock):
+        _instances.pop(name, None)
+
+def is_loaded(name):
+    return name in _instances
+
+def get_load_times():
+    """Seconds each provider took to build, for the providers loaded so far"""
+    return dict(_load_times)
+
+def _openai_backend():
+    import key_manager
+    # LLM_BASE_URL: beliebiger OpenAI-kompatibler Server
+    return {'api_key': key_manager.get_openai_key(), 'base_url': os.environ.get('LLM_BASE_URL') or None}
+
+def _mock_backend():
+    return {'api_key': 'mock', 'base_url': MOCK_LLM_URL}
+
+# Backend-Name -> Funktion, die die Client-Argumente (api_key, base_url) liefert
+BACKENDS = {
+    'openai': _openai_backend,
+    'mock': _mock_backend,
+}
+
+def register_backend(name, options):
+    """Register an OpenAI-compatible backend; options() returns OpenAI() keyword arguments"""
+    BACKENDS[name] = options
+
+def use_backend(name, isolated=False):
+    """
+    Switch the LLM backend; the client is rebuilt on the next call.
+    isolated=True confirms the caller keeps its state out of the project's caches.
+    """
+    global LLM_BACKEND, _backend_isolated
+    if name not in BACKENDS:
+        raise KeyError(f"Unknown LLM backend: {name}")
+    LLM_BACKEND = name
+    _backend_isolated = isolated
+    reset('openai')
+
+def backend_id():
+    """Backend part of LLM cache keys: None for the hosted OpenAI API, else name and base URL"""
+    if LLM_BACKEND == 'openai':
+        base_url = os.environ.get('LLM_BASE_URL')
+        return f"openai:{base_url}" if base_url else None
+    if LLM_BACKEND == 'mock':
+        return f"mock:{MOCK_LLM_URL}"
+    return LLM_BACKEND
+
+def check_backend_state():
+    """Refuse non-OpenAI backends whose results would land in the project's state"""
+    # Caches, Metriken, research_data.db, verarbeitete URLs und arXiv-Markierungen liegen relativ
+    # zum Arbeitsverzeichnis; Testläufe gegen andere Backends dürfen sie nicht überschreiben
+    if LLM_BACKEND == 'openai' or _backend_isolated:
+        return
+    if os.path.realpath(os.getcwd()) == os.path.realpath(PROJECT_DIR):
+        raise RuntimeError(
+            f"LLM_BACKEND={LLM_BACKEND} would write mock results into the project's caches and database; "
+            "run it from a separate working directory"
+        )
+
+def _build_openai_client():
+    from openai import OpenAI
+    if LLM_BACKEND not in BACKENDS:
+        raise KeyError(f"Unknown LLM backend: {LLM_BACKEND}")
+    check_backend_state()
+    # Wiederholungen übernimmt llm.chat()
+    return OpenAI(max_retries=0, **BACKENDS[LLM_BACKEND]())
+
+def _build_nlp():
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        import os
+        os.system(f"python -m spacy download {SPACY_MODEL}")
+        return spacy.load(SPACY_MODEL)
+
+class ApproxEncoding:
+    """Stand-in for a tiktoken encoding: words and punctuation as tokens"""
+
+    pattern = re.compile(r'\w+|[^\w\s]')
+
+    def encode(self, text):
+        return self.pattern.findall(text or '')
+
+def _build_tokenizer():
+    try:
+        import tiktoken
+    except ImportError:
+        logging.warning("tiktoken not installed, token counts are approximated")
+        return ApproxEncoding()
+    return tiktoken.get_encoding(TOKENIZER_ENCODING)
+
+def openai_client():
+    """Shared OpenAI client"""
+    return get('openai')
+
+def nlp():
+    """Shared spaCy pipeline"""
+    return get('spacy')
+
+def tokenizer():
+    """Shared tokenizer with encode(text) (tiktoken if installed)"""
+    return get('tokenizer')
+
+def scraper(source):
+    """Scraper module of a source (see SCRAPER_MODULES)"""
+    return get(f'scraper:{source}')
+
+register('openai', _build_openai_client)
+register('spacy', _build_nlp)
+register('tokenizer', _build_tokenizer)
+for _source, _module in SCRAPER_MODULES.items():
+    register(f'scraper:{_source}', lambda module=_module: importlib.import_module(module))
@@ -0,0 +1,75 @@
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+
+# Budget pro Host: (Anfragen pro Sekunde, Burst)
+DEFAULT_LIMIT = (2.0, 4)
+HOST_LIMITS = {
+    'thehackernews.com': (1.0, 2),
+    'theverge.com': (1.0, 2),
+    'techcrunch.com': (1.0, 2),
+    'venturebeat.com': (1.0, 2),
+    'ai.stanford.edu': (0.2, 1),
+    'arxiv.org': (1.0, 2),
+    'export.arxiv.org': (0.33, 1),
+}
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """Take tokens, sleeping only as long as this bucket is exhausted. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def _host(url_or_host):
+    host = urlparse(url_or_host).hostname if '://' in url_or_host else url_or_host
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def configure(host, rate, burst):
+    """Set or change the budget of a host"""
+    host = _host(host)
+    with _buckets_lock:
+        HOST_LIMITS[host] = (rate, burst)
+        _buckets[host] = TokenBucket(rate, burst)
+
+def get_bucket(url_or_host):
+    host = _host(url_or_host)
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            bucket = _buckets[host] = TokenBucket(rate, burst)
+    return bucket
+
+def acquire(url_or_host):
+    """Block until the host of url_or_host has budget for one more request"""
+    waited = get_bucket(url_or_host).acquire()
+    if waited > 0:
+        logging.debug(f"Rate limit for {_host(url_or_host)}: waited {waited:.2f}s")
+    return waited
@@ -1,19 +1,31 @@
-from openai import OpenAI
-import key_manager
-import spacy
+import os
+import json
+import providers
+import llm
+import prefilter
 import re
+import logging
+import threading
 from collections import Counter
 import cache_utils
 
-client = OpenAI(api_key=key_manager.get_openai_key())
+# spaCy-Modell und OpenAI-Client werden erst beim ersten Gebrauch geladen (providers.py)
 
-# Load spaCy model for NLP tasks
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import os
-    os.system("python -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# KI-Check, Relevanz, Keywords und Zusammenfassung in einem einzigen LLM-Aufruf (analyze_article)
+COMBINED_ANALYSIS = os.environ.get('LLM_COMBINED_ANALYSIS', '1') != '0'
+
+# Prompt-Kompression: statt des Textanfangs nur die relevantesten Sätze bis zum Token-Budget senden
+COMPRESSION = os.environ.get('PROMPT_COMPRESSION', '1') != '0'
+COMPRESS_BUDGET_TOKENS = int(os.environ.get('PROMPT_BUDGET_TOKENS', 700))
+PREFIX_CHARS = 3000  # ohne Kompression
+LEAD_BONUS = 0.5  # frühe Sätze tragen den Kontext (wer, was)
+BOILERPLATE_PATTERN = re.compile(
+    r'subscribe|newsletter|cookie|sign up|all rights reserved|advertisement|follow us|'
+    r'read more|share this|getty images|image credits?:', re.I
+)
+
+_compression_lock = threading.Lock()
+_compression_stats = {'calls': 0, 'tokens_before': 0, 'tokens_after': 0}
 
 # AI-related keywords with weights
 AI_KEYWORDS = {
@@ -41,7 +53,7 @@ AI_KEYWORDS = {
 }
 
 @cache_utils.cached(expiry=86400)
-def analyze_relevance(text, model="gpt-3.5-turbo"):
+def analyze_relevance(text, model=None):
     """
     Analyze text relevance using both keyword-based and AI-based methods
     Returns a score between 0 and 10
@@ -49,21 +61,23 @@ def analyze_relevance(text, model="gpt-3.5-turbo"):
     # First pass: quick keyword-based scoring
     keyword_score = calculate_keyword_score(text)
     
-    # If keyword score is very low, avoid API call
-    if keyword_score < 0.2:
+    # If keyword score is very low, avoid API call (thresholds in prefilter.SOURCE_THRESHOLDS)
+    decision = prefilter.classify(keyword_score, 'relevance')
+    prefilter.record('relevance', decision, keyword_score, int(decision == prefilter.SKIP))
+    if decision == prefilter.SKIP:
         return round(keyword_score * 5)  # Scale to 0-1 range
     
     # Second pass: detailed AI-based scoring
     ai_score = analyze_with_gpt(text, model)
     
-    # Combine scores (weighted average)
-    combined_score = (keyword_score * 0.4) + (ai_score * 0.6)
-    
-    # Return final score on scale 0-10
-    return round(combined_score * 10)
+    return combine_scores(keyword_score, ai_score)
 
-def calculate_keyword_score(text):
-    """Calculate relevance score based on keyword matching"""
+def combine_scores(keyword_score, ai_score):
+    """Weighted average of keyword and GPT score on the 0-10 scale"""
+    return round(((keyword_score * 0.4) + (ai_score * 0.6)) * 10)
+
+def calculate_keyword_score(text, use_entities=True):
+    """Calculate relevance score based on keyword matching (use_entities=False skips spaCy)"""
     text = text.lower()
     total_weight = 0
     matches = 0
@@ -83,8 +97,12 @@ def calculate_keyword_score(text):
     if matches == 0:
         return 0
     
+    base_score = min(1.0, total_weight / 10)  # Cap at 1.0
+    if not use_entities:
+        return base_score
+    
     # Extract named entities for additional context
-    doc = nlp(text[:2000])  # Limit to first 2000 chars for performance
+    doc = providers.nlp()(text[:2000])  # Limit to first 2000 chars for performance
     entities = [ent.text.lower() for ent in doc.ents if ent.label_ in ["ORG", "PRODUCT", "PERSON"]]
     
     # Check if AI companies/products are mentioned
@@ -92,24 +110,23 @@ def calculate_keyword_score(text):
     company_matches = sum(1 for company in ai_companies if any(company in entity for entity in entities))
     
     # Final score calculation with normalization
-    base_score = min(1.0, total_weight / 10)  # Cap at 1.0
     company_bonus = min(0.3, company_matches * 0.1)  # Max 0.3 bonus for companies
     
     return min(1.0, base_score + company_bonus)
 
-@cache_utils.cached(expiry=86400)
-def analyze_with_gpt(text, model="gpt-3.5-turbo"):
+def analyze_with_gpt(text, model=None):
     """Use GPT to analyze text relevance to AI topics"""
     prompt = (
         "On a scale of 0.0 to 1.0, rate how relevant this text is to artificial intelligence, "
         "machine learning, or related AI technologies. "
         "Consider technical depth, specificity to AI, and importance to the field. "
         "Return ONLY a single decimal number between 0.0 and 1.0, with no explanation.\n\n"
-        f"{text[:3000]}"
+        f"{compress_text(text, keyword_weighting=False)}"
     )
     try:
-        response = client.chat.completions.create(
+        response = llm.chat(
             model=model,
+            task="score",
             messages=[
                 {"role": "user", "content": prompt}
             ],
@@ -126,9 +143,72 @@ def analyze_with_gpt(text, model="gpt-3.5-turbo"):
         print(f"❌ Error in GPT relevance analysis: {e}")
         return 0.5  # Default score on error
 
+def analyze_article(text, summary_instruction="Summarize the article in a short paragraph.",
+                    system_prompt=None, model=None, max_tokens=400, temperature=0.3):
+    """
+    Classify, score, tag and summarize an article with one structured call.
+    Returns {'is_ai', 'relevance', 'keywords', 'summary', 'relevance_score'} or None on error;
+    relevance_score uses the same 0-10 scale as analyze_relevance().
+    """
+    prompt = (
+        "Analyze the following article and answer with a JSON object with these keys:\n"
+        '"is_ai": true if it meaningfully discusses artificial intelligence, machine learning '
+        "or AI-related technology (like LLMs, OpenAI, etc.), otherwise false;\n"
+        '"relevance": a number between 0.0 and 1.0 rating its relevance to AI, considering '
+        "technical depth, specificity to AI and importance to the field;\n"
+        '"keywords": a list of up to 8 short keywords;\n'
+        f'"summary": {summary_instruction} Focus on the most important, AI-related information. '
+        'Use an empty string if "is_ai" is false.\n\n'
+        f"{compress_text(text, keyword_weighting=False)}"
+    )
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    try:
+        response = llm.chat(
+            model=model,
+            task="summarize",
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        result = _parse_analysis(response.choices[0].message.content)
+    except Exception as e:
+        print(f"❌ Error in combined GPT analysis: {e}")
+        return None
+    if result is None:
+        print("❌ Combined GPT analysis returned no valid JSON")
+        return None
+    result['relevance_score'] = combine_scores(calculate_keyword_score(text), result['relevance'])
+    return result
+
+def _parse_analysis(content):
+    """Validate the JSON returned by analyze_article()"""
+    match = re.search(r'\{.*\}', content or '', re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+        relevance = min(1.0, max(0.0, float(data.get('relevance', 0.0))))
+    except (TypeError, ValueError):
+        return None
+    is_ai = data.get('is_ai')
+    if isinstance(is_ai, str):
+        is_ai = is_ai.strip().lower() in ('true', 'yes')
+    keywords = data.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = [kw.strip() for kw in keywords.split(',')]
+    return {
+        'is_ai': bool(is_ai),
+        'relevance': relevance,
+        'keywords': [str(kw) for kw in keywords if kw][:8],
+        'summary': str(data.get('summary') or '').strip(),
+    }
+
 def extract_keywords(text, max_keywords=10):
     """Extract important keywords from text"""
-    doc = nlp(text[:5000])  # Process first 5000 chars for performance
+    doc = providers.nlp()(text[:5000])  # Process first 5000 chars for performance
     
     # Filter for noun phrases and named entities
     important_tokens = []
@@ -147,21 +227,74 @@ def extract_keywords(text, max_keywords=10):
 
 def get_most_relevant_sentences(text, n=3):
     """Extract the most AI-relevant sentences from text"""
-    sentences = [sent.text.strip() for sent in nlp(text).sents]
+    sentences = [sent.text.strip() for sent in providers.nlp()(text).sents]
     
-    # Score each sentence
-    scored_sentences = []
-    for sentence in sentences:
-        if len(sentence) < 20:  # Skip very short sentences
-            continue
-            
-        score = 0
-        for keyword, weight in AI_KEYWORDS.items():
-            if keyword in sentence.lower():
-                score += weight
-                
-        scored_sentences.append((sentence, score))
+    # Score each sentence (skip very short sentences)
+    scored_sentences = [(sentence, score_sentence(sentence)) for sentence in sentences if len(sentence) >= 20]
     
     # Sort by score and return top n
     scored_sentences.sort(key=lambda x: x[1], reverse=True)
-    return [sent for sent, score in scored_sentences[:n]]
\ No newline at end of file
+    return [sent for sent, score in scored_sentences[:n]]
+
+def score_sentence(sentence):
+    """Sum of the AI keyword weights found in a sentence"""
+    sentence = sentence.lower()
+    return sum(weight for keyword, weight in AI_KEYWORDS.items() if keyword in sentence)
+
+def compress_text(text, budget_tokens=None, keyword_weighting=True):
+    """
+    Extractive compression before an LLM call: the top-scoring sentences
+    (keyword weight plus a bonus for the lead) up to budget_tokens, in
+    their original order. Boilerplate and repeated lines are dropped.
+    Classification and scoring prompts pass keyword_weighting=False: they
+    get the lead, so a passing AI mention does not look like the topic.
+    """
+    text = text or ''
+    if not COMPRESSION:
+        return text[:PREFIX_CHARS]
+    budget = budget_tokens or COMPRESS_BUDGET_TOKENS
+    encoding = providers.tokenizer()
+    tokens_before = len(encoding.encode(text))
+    if tokens_before <= budget:
+        _record_compression(tokens_before, tokens_before)
+        return text
+
+    candidates, seen = [], set()
+    for index, sentence in enumerate(re.split(r'(?<=[.!?])\s+|\n+', text)):
+        sentence = sentence.strip()
+        if len(sentence) < 20 or sentence in seen:
+            continue
+        seen.add(sentence)
+        score = score_sentence(sentence) if keyword_weighting else 0
+        if score == 0 and BOILERPLATE_PATTERN.search(sentence):
+            continue
+        candidates.append((score + LEAD_BONUS / (1 + index), index, sentence))
+
+    chosen, used = [], 0
+    for score, index, sentence in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        tokens = len(encoding.encode(sentence))
+        if used + tokens > budget:
+            if not keyword_weighting:
+                break  # reiner Textanfang, keine kurzen Sätze aus dem Rest nachfüllen
+            continue
+        chosen.append((index, sentence))
+        used += tokens
+
+    compressed = ' '.join(sentence for index, sentence in sorted(chosen)) or text[:PREFIX_CHARS]
+    _record_compression(tokens_before, len(encoding.encode(compressed)))
+    return compressed
+
+def _record_compression(tokens_before, tokens_after):
+    with _compression_lock:
+        _compression_stats['calls'] += 1
+        _compression_stats['tokens_before'] += tokens_before
+        _compression_stats['tokens_after'] += tokens_after
+    if tokens_after < tokens_before:
+        logging.info(f"Prompt compression: {tokens_before} -> {tokens_after} input tokens")
+
+def get_compression_stats():
+    """Input tokens before and after compression, summed over this process"""
+    with _compression_lock:
+        stats = dict(_compression_stats)
+    stats['ratio'] = round(stats['tokens_after'] / stats['tokens_before'], 3) if stats['tokens_before'] else 1.0
+    return stats
\ No newline at end of file
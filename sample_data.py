@@ -1,5 +1,5 @@
 import db_manager
-import json
+from article import Article
 from datetime import datetime, timedelta
 
 def add_sample_data():
@@ -17,7 +17,7 @@ def add_sample_data():
                 'pub_date': (datetime.now() - timedelta(days=2)).isoformat(),
                 'summary': 'This paper explores novel approaches to improve generalization in imitation learning systems, focusing on AI agents that learn from demonstrations.',
                 'content': 'Extended content about imitation learning systems...',
-                'keywords': json.dumps(['imitation learning', 'generalization', 'AI agents', 'reinforcement learning', 'neural networks']),
+                'keywords': ['imitation learning', 'generalization', 'AI agents', 'reinforcement learning', 'neural networks'],
                 'relevance_score': 0.95
             }
         },
@@ -29,7 +29,7 @@ def add_sample_data():
                 'pub_date': (datetime.now() - timedelta(days=1)).isoformat(),
                 'summary': 'This research investigates scaling laws for AI oversight mechanisms that can grow alongside increasingly powerful AI systems.',
                 'content': 'Extended content about AI oversight...',
-                'keywords': json.dumps(['AI safety', 'oversight', 'scaling laws', 'alignment', 'machine learning']),
+                'keywords': ['AI safety', 'oversight', 'scaling laws', 'alignment', 'machine learning'],
                 'relevance_score': 0.92
             }
         },
@@ -41,7 +41,7 @@ def add_sample_data():
                 'pub_date': datetime.now().isoformat(),
                 'summary': 'A consortium of tech companies announced a new framework for responsible AI development, focusing on transparency and accountability.',
                 'content': 'Full article about responsible AI development...',
-                'keywords': json.dumps(['responsible AI', 'ethics', 'governance', 'technology policy', 'industry standards']),
+                'keywords': ['responsible AI', 'ethics', 'governance', 'technology policy', 'industry standards'],
                 'relevance_score': 0.88
             }
         },
@@ -53,7 +53,7 @@ def add_sample_data():
                 'pub_date': (datetime.now() - timedelta(days=3)).isoformat(),
                 'summary': 'A team of researchers has announced a significant improvement in AI language understanding capabilities, achieving human-level performance on complex reasoning tasks.',
                 'content': 'Full article about AI language understanding...',
-                'keywords': json.dumps(['NLP', 'language models', 'reasoning', 'AI research', 'benchmarks']),
+                'keywords': ['NLP', 'language models', 'reasoning', 'AI research', 'benchmarks'],
                 'relevance_score': 0.91
             }
         },
@@ -65,7 +65,7 @@ def add_sample_data():
                 'pub_date': (datetime.now() - timedelta(days=4)).isoformat(),
                 'summary': 'Stanford University has launched a new research center dedicated to the study of AI safety and alignment, with a focus on long-term risks.',
                 'content': 'Full article about Stanford AI Safety Center...',
-                'keywords': json.dumps(['AI safety', 'alignment', 'research center', 'stanford', 'ethics']),
+                'keywords': ['AI safety', 'alignment', 'research center', 'stanford', 'ethics'],
                 'relevance_score': 0.94
             }
         },
@@ -77,7 +77,7 @@ def add_sample_data():
                 'pub_date': (datetime.now() - timedelta(days=2)).isoformat(),
                 'summary': 'Security researchers have identified novel attack vectors targeting AI systems, raising concerns about the security implications of deployed models.',
                 'content': 'Full article about AI security risks...',
-                'keywords': json.dumps(['cybersecurity', 'AI security', 'machine learning', 'vulnerabilities', 'attacks']),
+                'keywords': ['cybersecurity', 'AI security', 'machine learning', 'vulnerabilities', 'attacks'],
                 'relevance_score': 0.87
             }
         },
@@ -86,7 +86,7 @@ def add_sample_data():
     # Add sample articles to database
     print("Adding sample articles to database...")
     for article in sample_articles:
-        db_manager.save_article(article['source'], article['data'])
+        db_manager.save_article(Article(article['source'], **article['data']))
     
     print("Sample data added successfully!")
     
@@ -1,13 +1,12 @@
 import key_manager
-import time
-from openai import OpenAI
-from selenium import webdriver
+import llm
+import summarizer
+from article import Article
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+import browser_pool
+import page_fetcher
 
 
 # ==== CONFIGURATION ====
@@ -15,158 +14,135 @@ MAX_ARTICLES = 5
 WAIT_TIME = 10     
 TEXT_LIMIT = 2000
 STANFORD_AI_URL = "https://ai.stanford.edu/blog/"
+STANFORD_BASE_URL = "https://ai.stanford.edu"
 
-client = OpenAI(api_key=key_manager.get_openai_key())
-
-# ==== SETUP HEADLESS CHROME ====
-options = Options()
-options.add_argument("--headless")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-# Wichtig: Diese Option ermöglicht Nutzung trotz Versionsunterschieden
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--disable-gpu")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option("useAutomationExtension", False)
-options.add_experimental_option("excludeSwitches", ["enable-logging"])
-
-try:
-    # Versuche mit WebDriverManager
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-except Exception as e:
-    print(f"WebDriverManager fehlgeschlagen: {e}")
-    print("Versuche direkte WebDriver-Initialisierung...")
-    # Fallback auf direkten WebDriver ohne Manager
-    driver = webdriver.Chrome(options=options)
 
 # ==== STEP 1: GET BLOG POST LINKS ====
-def get_blog_links(main_url):
-    # ==== SETUP HEADLESS CHROME ====
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    # Wichtig: Diese Option ermöglicht Nutzung trotz Versionsunterschieden
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-
-    try:
-        # Versuche mit WebDriverManager
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    except Exception as e:
-        print(f"WebDriverManager fehlgeschlagen: {e}")
-        print("Versuche direkte WebDriver-Initialisierung...")
-        # Fallback auf direkten WebDriver ohne Manager
-        driver = webdriver.Chrome(options=options)
-    
-    driver.get(main_url)
-    time.sleep(10)
+def parse_blog_links(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
     
-    try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "post-teaser")))
-    except Exception as e:
-        print("⚠️ Warning: Articles did not load in time.")
+    for article in soup.select(".post-teaser")[:MAX_ARTICLES]:
+        excerpt = article.select_one(".excerpt")
+        button = article.select_one("div.excerpt-continue a.button")
+        if not excerpt or not button or not button.get("href"):
+            continue
+        links.append((excerpt.get_text(" ", strip=True), urljoin(STANFORD_BASE_URL, button["href"])))
     
-    articles = driver.find_elements(By.CLASS_NAME, "post-teaser")
-    print(f"📰 Found {len(articles)} posts")
-    links = []
+    return links
+
+def get_blog_links(main_url):
+    """Blog-Links ohne Browser holen (HTML, dann Feed), Selenium nur als Fallback"""
+    html = page_fetcher.fetch_static_html(main_url)
+    if html:
+        links = parse_blog_links(html)
+        if links:
+            page_fetcher.record_path('stanford', 'static')
+            print(f"📰 Found {len(links)} posts (static HTML)")
+            return links
+        
+        feed_url = page_fetcher.discover_feed(html, main_url)
+        entries = page_fetcher.fetch_feed_entries(feed_url) if feed_url else []
+        if entries:
+            page_fetcher.record_path('stanford', 'feed')
+            print(f"📰 Found {len(entries)} posts (feed)")
+            return [(entry.get('title', '').strip(), entry.get('link')) for entry in entries[:MAX_ARTICLES] if entry.get('link')]
     
-    for article in articles[:5]:  # Limit to 5 articles
-        try:
-            title = article.find_element(By.CLASS_NAME, "excerpt").text.strip()
-            button = article.find_element(By.CSS_SELECTOR, "div.excerpt-continue a.button")
-            link = button.get_attribute("href")
-            if link.startswith("/"):
-                link = "https://ai.stanford.edu" + link
-            print(f"✅ Extracted: {title} - {link}")
-            links.append((title, link))
-        except Exception as e:
-            print(f"⚠️ Error finding button for article: {e}")
+    page_fetcher.record_path('stanford', 'browser')
+    return get_blog_links_browser(main_url)
+
+def get_blog_links_browser(main_url):
+    # Browser kommt aus dem gemeinsamen Pool statt pro Aufruf neu gestartet zu werden
+    with browser_pool.browser() as driver:
+        if not browser_pool.load_page(driver, main_url, 'stanford_list', deadline=WAIT_TIME * 2):
+            print("⚠️ Warning: Articles did not load in time.")
+        
+        articles = driver.find_elements(By.CLASS_NAME, "post-teaser")
+        print(f"📰 Found {len(articles)} posts")
+        links = []
+        
+        for article in articles[:MAX_ARTICLES]:  # Limit to 5 articles
+            try:
+                title = article.find_element(By.CLASS_NAME, "excerpt").text.strip()
+                button = article.find_element(By.CSS_SELECTOR, "div.excerpt-continue a.button")
+                link = button.get_attribute("href")
+                if link.startswith("/"):
+                    link = "https://ai.stanford.edu" + link
+                print(f"✅ Extracted: {title} - {link}")
+                links.append((title, link))
+            except Exception as e:
+                print(f"⚠️ Error finding button for article: {e}")
     
-    driver.quit()
     return links
 
 def extract_article(url):
-    # ==== SETUP HEADLESS CHROME ====
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    # Wichtig: Diese Option ermöglicht Nutzung trotz Versionsunterschieden
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    """Artikel per HTTP extrahieren, Selenium nur wenn der Inhalt nicht im HTML steht"""
+    html = page_fetcher.fetch_static_html(url)
+    if html:
+        soup = BeautifulSoup(html, 'html.parser')
+        if soup.select_one(".post-content"):
+            heading = soup.select_one(".post-header h1") or soup.select_one("header h1")
+            paragraphs = soup.select("section.post-content p")
+            content = "\n\n".join(p.get_text().strip() for p in paragraphs)
+            if heading and content:
+                page_fetcher.record_path('stanford', 'static')
+                print(f"📄 Extracted content length: {len(content)} characters")
+                return heading.get_text(strip=True), content
+    
+    page_fetcher.record_path('stanford', 'browser')
+    return extract_article_browser(url)
 
-    try:
-        # Versuche mit WebDriverManager
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    except Exception as e:
-        print(f"WebDriverManager fehlgeschlagen: {e}")
-        print("Versuche direkte WebDriver-Initialisierung...")
-        # Fallback auf direkten WebDriver ohne Manager
-        driver = webdriver.Chrome(options=options)
-    driver.get(url)
-    try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "post-content")))
-        
+def extract_article_browser(url):
+    with browser_pool.browser() as driver:
         try:
-            header = driver.find_element(By.CLASS_NAME, "post-header")
-            title = header.find_element(By.TAG_NAME, "h1").text.strip()
-        except:
-            title = driver.find_element(By.CSS_SELECTOR, "header h1").text.strip()
-        
-        paragraphs = driver.find_elements(By.CSS_SELECTOR, "section.post-content p")
-        content = "\n\n".join(p.text for p in paragraphs)
-        print(f"📄 Extracted content length: {len(content)} characters")
-        
-        driver.quit()
-        return title, content
-    except Exception as e:
-        print(f"❌ Error extracting article at {url}: {e}")
-        driver.quit()
-        return None, None
+            if not browser_pool.load_page(driver, url, 'stanford_article', deadline=WAIT_TIME):
+                raise TimeoutError("post-content did not load in time")
+            
+            try:
+                header = driver.find_element(By.CLASS_NAME, "post-header")
+                title = header.find_element(By.TAG_NAME, "h1").text.strip()
+            except:
+                title = driver.find_element(By.CSS_SELECTOR, "header h1").text.strip()
+            
+            paragraphs = driver.find_elements(By.CSS_SELECTOR, "section.post-content p")
+            content = "\n\n".join(p.text for p in paragraphs)
+            print(f"📄 Extracted content length: {len(content)} characters")
+            
+            return title, content
+        except Exception as e:
+            print(f"❌ Error extracting article at {url}: {e}")
+            return None, None
 
 def summarize_text(article_text):
-    prompt = (
-        "Summarize this blog post in 3 paragraphs. Focus on key contributions and methodology. "
-        "Please keep the summary concise and only name the most relevant information out of the article:\n\n"
-        f"{article_text}"
-    )
-    
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Du bist ein hilfreicher Assistent, der Artikel prägnant zusammenfasst. Das Ganze bitte auf Deutsch."},
-                {"role": "user", "content": prompt}
-            ],
+        # Lange Artikel werden in Chunks parallel zusammengefasst und danach verdichtet
+        return summarizer.summarize(
+            article_text,
+            "Summarize this blog post in 3 paragraphs. Focus on key contributions and methodology. "
+            "Please keep the summary concise and only name the most relevant information out of the article:",
+            system_prompt="Du bist ein hilfreicher Assistent, der Artikel prägnant zusammenfasst. Das Ganze bitte auf Deutsch.",
             temperature=0.7,
             max_tokens=300,
             stop=["\n\n"]
         )
-        summary = response.choices[0].message.content.strip()
-        return summary
     except Exception as e:
         print("Fehler bei der ChatGPT API Anfrage:", e)
         return ""
     
 def main_stanford():
-    summaries = []
     print("🔍 Scraping Stanford AI Blog...")
     blog_links = get_blog_links(STANFORD_AI_URL)
     print(f"🔗 Found {len(blog_links)} articles")
     
-    for title, link in blog_links:
+    def process(blog_link):
+        title, link = blog_link
         print(f"--- Processing: {title} ---")
         article_title, full_text = extract_article(link)
         if article_title and full_text:
-            summary = summarize_text(full_text)
-            summaries.append((article_title, link, summary))
-        time.sleep(5)
+            return Article('stanford', article_title, link, summarize_text(full_text))
+        return None
+    
+    # Artikel gleichzeitig laden und zusammenfassen (Browser-Pool begrenzt Selenium)
+    summaries = [result for result in llm.run_concurrently(process, blog_links) if result]
     
     return summaries if summaries else None
@@ -0,0 +1,143 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import llm
+import llm_metrics
+import providers
+
+# Configuration
+CHUNK_TOKENS = int(os.environ.get('SUMMARY_CHUNK_TOKENS', 1500))  # maximale Chunk-Größe
+MIN_CHUNK_TOKENS = CHUNK_TOKENS // 2  # ab hier darf an einem inhaltsdefinierten Absatz geschnitten werden
+BOUNDARY_MODULUS = 3  # Absätze mit hash % 3 == 0 sind Schnittstellen; bleiben bei Änderungen stabil
+MAX_CHUNKS = int(os.environ.get('SUMMARY_MAX_CHUNKS', 16))  # darüber hinaus wird der Text abgeschnitten
+CHUNK_SUMMARY_TOKENS = 200
+REDUCE_INPUT_TOKENS = 3000  # mehr Teilzusammenfassungen werden stufenweise verdichtet
+CHUNK_WORKERS = int(os.environ.get('SUMMARY_CHUNK_WORKERS', 4))
+
+CHUNK_PROMPT = (
+    "The following text is one part of a longer document. Summarize this part in a few sentences, "
+    "keeping key contributions, methods, results and names:\n\n"
+)
+REDUCE_PROMPT = "The following are summaries of consecutive parts of one document.\n\n"
+
+logger = logging.getLogger('ai_research_hub.summarizer')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def count_tokens(text):
+    return len(providers.tokenizer().encode(text or ''))
+
+def _pieces(text):
+    """Paragraphs, with oversized paragraphs split into sentences and then words"""
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= CHUNK_TOKENS:
+            yield paragraph
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+            if count_tokens(sentence) <= CHUNK_TOKENS:
+                yield sentence
+                continue
+            words = sentence.split()
+            step = max(1, len(words) * CHUNK_TOKENS // count_tokens(sentence))
+            for i in range(0, len(words), step):
+                yield ' '.join(words[i:i + step])
+
+def _is_boundary(piece):
+    return int(hashlib.md5(piece.encode('utf-8')).hexdigest(), 16) % BOUNDARY_MODULUS == 0
+
+def split_chunks(text):
+    """
+    Split text into chunks of at most CHUNK_TOKENS tokens. Cuts prefer
+    content-defined paragraph boundaries, so an edit in one part of the
+    text leaves the other chunks (and their cached summaries) unchanged.
+    """
+    chunks, current, size = [], [], 0
+    for piece in _pieces(text):
+        tokens = count_tokens(piece)
+        if current and size + tokens > CHUNK_TOKENS:
+            chunks.append('\n\n'.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+        if size >= MIN_CHUNK_TOKENS and _is_boundary(piece):
+            chunks.append('\n\n'.join(current))
+            current, size = [], 0
+        if len(chunks) >= MAX_CHUNKS:
+            logger.warning(f"Text longer than {MAX_CHUNKS} chunks, remainder is not summarized")
+            return chunks
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+def _get_executor():
+    # Eigener Pool für Chunks: summarize() läuft selbst meist schon im llm-Executor
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix='summary-chunk')
+        return _executor
+
+def _map(fn, items):
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    fn = llm_metrics.bind_caller(fn)
+    futures = [_get_executor().submit(fn, item) for item in items]
+    return [future.result() for future in futures]
+
+def _summarize_chunk(chunk, model):
+    # Gleicher Chunk-Inhalt -> gleicher Schlüssel im LLM-Cache (llm_cache)
+    response = llm.chat(
+        model=model,
+        task='summarize',
+        messages=[{"role": "user", "content": CHUNK_PROMPT + chunk}],
+        temperature=0,
+        max_tokens=CHUNK_SUMMARY_TOKENS
+    )
+    return response.choices[0].message.content.strip()
+
+def _final(text, instruction, system_prompt, model, params):
+    messages = [{"role": "user", "content": f"{instruction}\n\n{text}"}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    response = llm.chat(model=model, task='summarize', messages=messages, **params)
+    return response.choices[0].message.content.strip()
+
+def summarize(text, instruction, system_prompt=None, model=None, **params):
+    """
+    Map-reduce summary of text of any length. Short texts take one call;
+    longer ones are chunked, the chunks summarized concurrently and the
+    chunk summaries reduced (in several rounds if needed) into the final
+    summary. params (max_tokens, temperature, ...) apply to the final call.
+    Without a model, llm_router picks the 'summarize' model per call.
+    """
+    text = (text or '').strip()
+    if count_tokens(text) <= CHUNK_TOKENS:
+        return _final(text, instruction, system_prompt, model, params)
+
+    chunks = split_chunks(text)
+    logger.info(f"Summarizing {len(chunks)} chunks ({count_tokens(text)} tokens)")
+    partials = _map(lambda chunk: _summarize_chunk(chunk, model), chunks)
+
+    # Teilzusammenfassungen so lange gruppenweise verdichten, bis sie in einen Aufruf passen
+    while count_tokens('\n\n'.join(partials)) > REDUCE_INPUT_TOKENS and len(partials) > 1:
+        groups, current, size = [], [], 0
+        for partial in partials:
+            tokens = count_tokens(partial)
+            if current and size + tokens > REDUCE_INPUT_TOKENS:
+                groups.append(current)
+                current, size = [], 0
+            current.append(partial)
+            size += tokens
+        groups.append(current)
+        if len(groups) == len(partials):
+            break  # einzelne Teile sind schon zu groß, nicht weiter verdichtbar
+        partials = _map(lambda group: _summarize_chunk('\n\n'.join(group), model), groups)
+
+    return _final(REDUCE_PROMPT + '\n\n'.join(partials), instruction, system_prompt, model, params)
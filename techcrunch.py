@@ -1,9 +1,12 @@
 import key_manager
-from selenium import webdriver
-import time
+import browser_pool
+import page_fetcher
 from bs4 import BeautifulSoup
-from openai import OpenAI
-import requests
+import llm
+import relevance
+import dedup
+from article import Article
+import http_client
 import locale
 from datetime import datetime, timedelta
 import re
@@ -18,6 +21,9 @@ except locale.Error:
 # URL zum TechCrunch AI Bereich
 TECHCRUNCH_AI_URL = "https://techcrunch.com/category/artificial-intelligence/" # Mehrere Links gleichzeitig
 
+# Artikel-Links enthalten das Veröffentlichungsdatum
+DATED_LINK_PATTERN = re.compile(r'/\d{4}/\d{2}/\d{2}/')
+
 # Maximale Anzahl an Artikeln, die verarbeitet werden sollen
 MAX_ARTICLES = 10
 
@@ -50,7 +56,6 @@ def save_processed_articles(processed_urls):
     except Exception as e:
         print(f"Fehler beim Speichern des Artikel-Caches: {e}")
 
-client = OpenAI(api_key=key_manager.get_openai_key()) # Client festlegen mit gegebenen API Key für Zusammenfassung
 
 def unique_articles(articles, seen):
     unique_articles = []
@@ -87,10 +92,10 @@ def is_meaningfully_about_ai(text, api_key):
         "Does the following article meaningfully discuss artificial intelligence, "
         "machine learning, or AI-related technology (like LLMs, OpenAI, etc.)? "
         "Answer with only 'Yes' or 'No'.\n\n"
-        f"{text[:3000]}"
+        f"{relevance.compress_text(text, keyword_weighting=False)}"
     )
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = llm.chat(
+        task="classify",
         messages=[{"role": "user", "content": prompt}],
         temperature=0,
         max_tokens=5
@@ -99,10 +104,9 @@ def is_meaningfully_about_ai(text, api_key):
 
     return "yes" in answer
 
-def summarize_with_openai(link, api_key):
-    client = OpenAI(api_key=api_key)
+def summarize_with_openai(link, api_key, title=''):
     headers = {'User-Agent': 'Mozilla/5.0'}
-    article_html = requests.get(link).text
+    article_html = http_client.get(link).text
     soup = BeautifulSoup(article_html, 'html.parser')
 
     paragraphs = soup.find_all('p')
@@ -111,10 +115,23 @@ def summarize_with_openai(link, api_key):
     if not article_text:
         return "Inhalt konnte nicht gefunden werden"
 
-    prompt = f"Summarize the blog post in a short paragraph. Focus on key contributions and methodology:\n\n{article_text[:3000]}"
+    # Dieselbe Meldung wird nur einmal zusammengefasst (auch quellenübergreifend)
+    cluster_id, representative = dedup.claim('techcrunch', title, link, article_text)
+    if not representative:
+        if dedup.pending(cluster_id):
+            print(f"⏳ Meldung wird noch zusammengefasst ({cluster_id}), nächster Lauf prüft erneut.")
+            return dedup.PENDING
+        print(f"🔁 Meldung bereits erfasst ({cluster_id}), keine eigene Zusammenfassung.")
+        return None
+
+    # Ohne Zusammenfassung gibt der Artikel die Meldung für andere Quellen wieder frei
+    return dedup.summarize_claimed(link, summarize_text, article_text)
+
+def summarize_text(article_text):
+    prompt = f"Summarize the blog post in a short paragraph. Focus on key contributions and methodology:\n\n{relevance.compress_text(article_text)}"
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = llm.chat(
+        task="summarize",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3,
         max_tokens=250,
@@ -124,17 +141,11 @@ def summarize_with_openai(link, api_key):
     return response.choices[0].message.content.strip()
 
 def fetch_page_html(url):
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(options=options)
-    driver.get(url)
-    time.sleep(15)
-    html = driver.page_source
-    driver.quit()
-    return html
+    with browser_pool.browser() as driver:
+        # Wartet auf die Artikel-Links statt pauschal 15 Sekunden
+        if not browser_pool.load_page(driver, url, 'techcrunch_list'):
+            print("⚠️ TechCrunch Seite nicht vollständig geladen, verwende bisherigen Stand.")
+        return driver.page_source
 
 def scrape_techcrunch_ai_articles(html):
     soup = BeautifulSoup(html, 'html.parser')
@@ -164,6 +175,41 @@ def scrape_techcrunch_ai_articles(html):
 
     return unique_articles
 
+def scrape_techcrunch_feed(entries):
+    today = datetime.today().strftime('%Y/%m/%d')
+    yesterday = (datetime.today() - timedelta(days=1)).strftime('%Y/%m/%d')
+
+    articles = []
+    seen = set()
+    for entry in entries:
+        link = entry.get('link', '')
+        if (today in link or yesterday in link) and link not in seen:
+            articles.append({
+                "title": entry.get('title', '').strip(),
+                "link": link
+            })
+            seen.add(link)
+
+    return articles
+
+def fetch_article_list(url):
+    """Artikelliste ohne Browser holen (HTML, dann RSS-Feed), Selenium nur als Fallback"""
+    html = page_fetcher.fetch_static_html(url)
+    if html:
+        # Datierte /YYYY/MM/DD/-Links vorhanden: Seite ist serverseitig gerendert
+        if DATED_LINK_PATTERN.search(html):
+            page_fetcher.record_path('techcrunch', 'static')
+            return scrape_techcrunch_ai_articles(html)
+
+        feed_url = page_fetcher.discover_feed(html, url)
+        entries = page_fetcher.fetch_feed_entries(feed_url) if feed_url else []
+        if entries:
+            page_fetcher.record_path('techcrunch', 'feed')
+            return scrape_techcrunch_feed(entries)
+
+    page_fetcher.record_path('techcrunch', 'browser')
+    return scrape_techcrunch_ai_articles(fetch_page_html(url))
+
 def main_techcrunch():
     print("Scraping TechCrunch gestartet...")
     
@@ -171,8 +217,7 @@ def main_techcrunch():
     cache_data = load_processed_articles()
     processed_urls = set(cache_data["processed_urls"])
     
-    html = fetch_page_html(TECHCRUNCH_AI_URL)
-    articles = scrape_techcrunch_ai_articles(html)
+    articles = fetch_article_list(TECHCRUNCH_AI_URL)
 
     if not articles:
         print("❌ Keine heutigen TechCrunch Artikel gefunden.")
@@ -195,35 +240,40 @@ def main_techcrunch():
     articles_to_process = new_articles[:MAX_ARTICLES]
     total_articles = len(articles_to_process)
     
-    for idx, article in enumerate(articles_to_process, 1):
-        print(f"Zusammenfassen [{idx}/{total_articles}]: {article['title']}")
+    def process(article):
+        print(f"Zusammenfassen: {article['title']}")
         try:
             # Versuche die Zusammenfassung zu erstellen
-            summary = summarize_with_openai(article['link'], key_manager.get_openai_key())
-            
-            # Wenn die Zusammenfassung None ist, setze einen Standardwert
-            if summary is None:
-                summary = "Keine Zusammenfassung verfügbar."
-            
-            # URL als verarbeitet markieren
-            processed_urls.add(article["link"])
-                
+            # None: Duplikat einer bereits erfassten Meldung
+            summary = summarize_with_openai(article['link'], key_manager.get_openai_key(), article['title'])
         except Exception as e:
             print(f"⚠️ Fehler bei der Zusammenfassung von '{article['title']}': {str(e)}")
-            summary = f"Zusammenfassung fehlgeschlagen: {str(e)}"
-            
+            return False, f"Zusammenfassung fehlgeschlagen: {str(e)}"
+        # Duplikat einer noch offenen Meldung nicht als verarbeitet markieren
+        if summary is dedup.PENDING:
+            return False, None
+        return True, summary
+    
+    # Alle Artikel gleichzeitig abrufen und zusammenfassen
+    print(f"⚙️ Verarbeite {total_articles} Artikel parallel...")
+    results = llm.run_concurrently(process, articles_to_process)
+    
+    for article, (ok, summary) in zip(articles_to_process, results):
+        # URL als verarbeitet markieren
+        if ok:
+            processed_urls.add(article["link"])
+        if summary is None:
+            continue
         articles_processed += 1
-        summarized_articles.append([
+        # Datum steckt im Link (/YYYY/MM/DD/)
+        date_match = DATED_LINK_PATTERN.search(article["link"])
+        summarized_articles.append(Article(
+            'techcrunch',
             article["title"],
             article["link"],
-            summary
-        ])
-        
-        # Speichere regelmäßig den Cache
-        if articles_processed % 5 == 0 or idx == total_articles:
-            save_processed_articles(list(processed_urls))
-            
-        time.sleep(1)  # Rate limiting
+            summary,
+            pub_date=date_match.group(0).strip('/').replace('/', '-') if date_match else None
+        ))
     
     # Abschließendes Speichern des Caches
     save_processed_articles(list(processed_urls))
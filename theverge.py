@@ -1,10 +1,13 @@
 import key_manager
 import feedparser
-import requests
+import http_client
 from bs4 import BeautifulSoup
-from openai import OpenAI
+import llm
+import relevance
+import prefilter
+import dedup
+from article import Article
 from datetime import datetime, timedelta, timezone
-import time
 import re
 import os
 import json
@@ -43,10 +46,13 @@ def save_processed_articles(processed_urls):
     except Exception as e:
         print(f"Fehler beim Speichern des TheVerge-Artikel-Caches: {e}")
 
-client = OpenAI(api_key=key_manager.get_openai_key())
 
 def get_recent_articles_from_sitemap(feed_url):
-    feed = feedparser.parse(feed_url)
+    """Return recent feed entries, or None if the feed is unchanged since the last committed poll"""
+    response = http_client.conditional_get(feed_url)
+    if response is None:
+        return None
+    feed = feedparser.parse(response.content)
     cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=24)
 
     recent_articles = []
@@ -64,12 +70,14 @@ def get_recent_articles_from_sitemap(feed_url):
 
     return recent_articles
 
+AI_KEYWORDS = [
+    "AI", "artificial intelligence", "machine learning",
+    "neural network", "large language model", "LLM",
+    "OpenAI", "GPT", "chatbot"
+]
+
 def is_ai_related(text):
-    keywords = [
-        "AI", "artificial intelligence", "machine learning",
-        "neural network", "large language model", "LLM",
-        "OpenAI", "GPT", "chatbot"
-    ]
+    keywords = AI_KEYWORDS
     keyword_hits = []
     matched_sentences = []
 
@@ -89,10 +97,10 @@ def is_meaningfully_about_ai(text, api_key):
         "Does the following article meaningfully discuss artificial intelligence, "
         "machine learning, or AI-related technology (like LLMs, OpenAI, etc.)? "
         "Answer with only 'Yes' or 'No'.\n\n"
-        f"{text[:3000]}"
+        f"{relevance.compress_text(text, keyword_weighting=False)}"
     )
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = llm.chat(
+        task="classify",
         messages=[{"role": "user", "content": prompt}],
         temperature=0,
         max_tokens=5
@@ -100,9 +108,9 @@ def is_meaningfully_about_ai(text, api_key):
     answer = response.choices[0].message.content.strip().lower()
     return "yes" in answer
 
-def summarize_with_openai(link, api_key):
+def summarize_with_openai(link, api_key, title=''):
     headers = {'User-Agent': 'Mozilla/5.0'}
-    article_html = requests.get(link, headers=headers).text
+    article_html = http_client.get(link, headers=headers).text
     soup = BeautifulSoup(article_html, 'html.parser')
 
     paragraphs = soup.find_all('p')
@@ -115,27 +123,67 @@ def summarize_with_openai(link, api_key):
     if not article_text:
         return None
 
-    # Prüfe, ob der Artikel KI-bezogen ist
-    if not is_meaningfully_about_ai(article_text, api_key):
-        print("❌ GPT sagt: Kein AI-Artikel. Wird übersprungen.")
-        return None
-
     # Extrahiere Keywords für Debugging
     keywords, sentences = is_ai_related(article_text)
     if keywords:
         print(f"Gefundene AI-Keywords: {', '.join(keywords)}")
 
-    prompt = f"Summarize this blog post in a short paragraph. Focus on the most important, AI-related information in the summary: \n\n{article_text[:3000]}"
+    # Lokaler Vorfilter: eindeutig irrelevante Artikel kosten keinen LLM-Aufruf,
+    # eindeutig relevante brauchen keinen Ja/Nein-Check
+    saves = {prefilter.SKIP: 1} if relevance.COMBINED_ANALYSIS else {prefilter.SKIP: 2, prefilter.DEEP: 1}
+    value = prefilter.score(article_text, title, extra_keywords=AI_KEYWORDS)
+    decision = prefilter.classify(value, 'theverge')
+    prefilter.record('theverge', decision, value, saves.get(decision, 0), title, link)
+    if decision == prefilter.SKIP:
+        print("⏩ Vorfilter: Kein AI-Bezug erkennbar. Wird ohne GPT übersprungen.")
+        return None
+
+    # Dieselbe Meldung wird nur einmal zusammengefasst (auch quellenübergreifend)
+    cluster_id, representative = dedup.claim('theverge', title, link, article_text)
+    if not representative:
+        if dedup.pending(cluster_id):
+            print(f"⏳ Meldung wird noch zusammengefasst ({cluster_id}), nächster Lauf prüft erneut.")
+            return dedup.PENDING
+        print(f"🔁 Meldung bereits erfasst ({cluster_id}), keine eigene Zusammenfassung.")
+        return None
+
+    # Ohne Zusammenfassung gibt der Artikel die Meldung für andere Quellen wieder frei
+    return dedup.summarize_claimed(link, analyze_article_text, article_text, api_key, decision, value, title, link)
+
+def analyze_article_text(article_text, api_key, decision, value=0.0, title='', link=''):
+    # KI-Check, Relevanz, Keywords und Zusammenfassung in einem Aufruf
+    if relevance.COMBINED_ANALYSIS:
+        analysis = relevance.analyze_article(
+            article_text, "Summarize this blog post in a short paragraph.", max_tokens=350
+        )
+        if analysis is None:
+            raise RuntimeError("Kombinierte GPT-Analyse fehlgeschlagen")
+        # GPT-Urteil zum Vorfilter-Score loggen (Kalibrierung mit prefilter.calibrate())
+        prefilter.record_outcome('theverge', value, analysis['is_ai'], title, link)
+        if not analysis['is_ai'] or not analysis['summary']:
+            print("❌ GPT sagt: Kein AI-Artikel. Wird übersprungen.")
+            return None
+        return analysis
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    # Prüfe, ob der Artikel KI-bezogen ist
+    if decision != prefilter.DEEP:
+        is_ai = is_meaningfully_about_ai(article_text, api_key)
+        prefilter.record_outcome('theverge', value, is_ai, title, link)
+        if not is_ai:
+            print("❌ GPT sagt: Kein AI-Artikel. Wird übersprungen.")
+            return None
+
+    prompt = f"Summarize this blog post in a short paragraph. Focus on the most important, AI-related information in the summary: \n\n{relevance.compress_text(article_text)}"
+
+    response = llm.chat(
+        task="summarize",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3,
         max_tokens=250,
         stop=["\n\n"]
     )
 
-    return response.choices[0].message.content.strip()
+    return {'summary': response.choices[0].message.content.strip()}
 
 def main_verge():
     print("📡 Abrufen der RSS-Feeds von The Verge...")
@@ -146,7 +194,12 @@ def main_verge():
     
     articles = get_recent_articles_from_sitemap(SITEMAP_FEED_URL)
 
+    if articles is None:
+        print("✓ The Verge Feed unverändert seit dem letzten Abruf.")
+        return http_client.NOT_MODIFIED
+
     if not articles:
+        http_client.commit_validators(SITEMAP_FEED_URL)
         print("❌ Keine aktuellen The Verge Artikel in den letzten 24 Stunden gefunden.")
         return []
 
@@ -156,6 +209,7 @@ def main_verge():
     new_articles = [article for article in articles if article["link"] not in processed_urls]
     if not new_articles:
         print("✓ Alle verfügbaren The Verge Artikel wurden bereits verarbeitet.")
+        http_client.commit_validators(SITEMAP_FEED_URL)
         return []
         
     print(f"✓ {len(new_articles)} neue The Verge Artikel zum Verarbeiten gefunden.")
@@ -167,38 +221,48 @@ def main_verge():
     articles_to_process = new_articles[:MAX_ARTICLES]
     total_articles = len(articles_to_process)
     
-    for idx, article in enumerate(articles_to_process, 1):
-        print(f"\n✏️ Prüfe Artikel auf AI-Bezug [{idx}/{total_articles}]: {article['title']}")
+    def process(article):
+        print(f"\n✏️ Prüfe Artikel auf AI-Bezug: {article['title']}")
         try:
-            summary = summarize_with_openai(article['link'], key_manager.get_openai_key())
-            
-            if summary:
-                print(f"✅ GPT validiert: Artikel ist AI-relevant.")
-                summarized_articles.append([
-                    article["title"],
-                    article["link"],
-                    summary,
-                    datetime.today().strftime('%Y-%m-%d')
-                ])
-                
-                # URL als verarbeitet markieren
-                processed_urls.add(article["link"])
-                articles_processed += 1
-            else:
-                print("⏩ Kein AI-Bezug, übersprungen.")
-                # Auch nicht-AI-relevante Artikel als verarbeitet markieren
-                processed_urls.add(article["link"])
+            result = summarize_with_openai(article['link'], key_manager.get_openai_key(), article['title'])
         except Exception as e:
             print(f"⚠️ Fehler bei der Verarbeitung von '{article['title']}': {str(e)}")
-        
-        # Speichere regelmäßig den Cache
-        if articles_processed % 3 == 0 or idx == total_articles:
-            save_processed_articles(list(processed_urls))
-            
-        time.sleep(1)  # Rate limiting
+            return False, None
+        # Duplikat einer noch offenen Meldung nicht als verarbeitet markieren
+        if result is dedup.PENDING:
+            return False, None
+        return True, result
+    
+    # Alle Artikel gleichzeitig abrufen und zusammenfassen
+    print(f"⚙️ Verarbeite {total_articles} Artikel parallel...")
+    results = llm.run_concurrently(process, articles_to_process)
+    
+    for article, (ok, result) in zip(articles_to_process, results):
+        if not ok:
+            continue
+        # Auch nicht-AI-relevante Artikel als verarbeitet markieren
+        processed_urls.add(article["link"])
+        if result:
+            print(f"✅ GPT validiert: {article['title']}")
+            summarized_articles.append(Article(
+                'theverge',
+                article["title"],
+                article["link"],
+                result['summary'],
+                pub_date=datetime.today().strftime('%Y-%m-%d'),
+                keywords=result.get('keywords'),
+                relevance_score=result.get('relevance_score')
+            ))
+            articles_processed += 1
+        else:
+            print(f"⏩ Kein AI-Bezug oder Duplikat, übersprungen: {article['title']}")
     
     # Abschließendes Speichern des Caches
     save_processed_articles(list(processed_urls))
+    
+    # Feed erst als gesehen markieren, wenn keine neuen Artikel mehr offen sind
+    if len(new_articles) <= MAX_ARTICLES:
+        http_client.commit_validators(SITEMAP_FEED_URL)
     print(f"✅ The Verge Scraping abgeschlossen. {articles_processed} AI-relevante Artikel gefunden.")
 
     return summarized_articles if summarized_articles else []
@@ -207,9 +271,8 @@ if __name__ == "__main__":
     results = main_verge()
     if results:
         for r in results:
-            # Array-Struktur: [title, link, summary, date]
-            print("\n📰", r[0])  # Titel
-            print(r[2])  # Zusammenfassung
-            print("🔗", r[1])  # Link
-            print("📅", r[3])  # Datum
+            print("\n📰", r.title)
+            print(r.summary)
+            print("🔗", r.link)
+            print("📅", r.date)
             print("---")
@@ -1,14 +1,16 @@
 import feedparser
 from bs4 import BeautifulSoup
-import requests
-from openai import OpenAI
+import http_client
+import llm
+import prefilter
+import dedup
+import relevance
+from article import Article
 from datetime import datetime, timedelta, timezone
-import time
 import key_manager
 import os
 import json
 
-client = OpenAI(api_key=key_manager.get_openai_key())
 
 # RSS Feed URL - Using the direct site feed instead of Feedburner
 THN_FEED_URL = "https://thehackernews.com/feeds/posts/default?alt=rss"
@@ -54,7 +56,9 @@ AI_KEYWORDS = [
 ]
 
 def fetch_thn_articles():
-    feed = feedparser.parse(THN_FEED_URL)
+    # Einfacher GET: die Validatoren des Feeds gehören main_thn()
+    response = http_client.get(THN_FEED_URL)
+    feed = feedparser.parse(response.content)
     cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=72)  # Extended to 3 days
 
     articles = []
@@ -92,7 +96,7 @@ def fetch_thn_articles():
             else:
                 # Fetch the full article if content not in feed
                 try:
-                    response = requests.get(link, timeout=10)
+                    response = http_client.get(link)
                     soup = BeautifulSoup(response.text, "html.parser")
                     article_body = soup.find('div', {'class': 'post-body'})
                     html_content = str(article_body) if article_body else ""
@@ -103,10 +107,11 @@ def fetch_thn_articles():
             # Extract text from HTML
             text = BeautifulSoup(html_content, "html.parser").get_text()
             
-            # Check if AI related but don't skip if not
+            # Lokaler Vorfilter: nicht KI-bezogene Artikel werden nicht zusammengefasst
             ai_related, matched_keywords = is_ai_related_with_details(text)
-            if not ai_related:
-                print(f"ℹ️ Artikel nicht KI-bezogen, aber wird trotzdem verarbeitet: {title}")
+            if prefilter.decide(text, 'thehackernews', title, link, extra_keywords=AI_KEYWORDS) == prefilter.SKIP:
+                print(f"⏩ Vorfilter: Artikel nicht KI-bezogen, übersprungen: {title}")
+                continue
             
             summary = summarize_article(text)
 
@@ -119,8 +124,6 @@ def fetch_thn_articles():
                 "Datum": published.strftime("%Y-%m-%d")
             })
 
-            time.sleep(1)  # Rate limiting
-
         except Exception as e:
             print(f"⚠️ Fehler beim Verarbeiten eines Artikels: {e}")
 
@@ -140,6 +143,10 @@ def is_ai_related(text):
     related, _ = is_ai_related_with_details(text)
     return related
 
+SYSTEM_PROMPT = "Du bist ein hilfreicher Assistent, der sicherheitsrelevante Artikel zusammenfasst."
+
+SUMMARY_FAILED = "Zusammenfassung fehlgeschlagen."
+
 def summarize_article(text):
     if not text or len(text.strip()) < 100:
         return "Nicht genügend Text für eine Zusammenfassung."
@@ -147,12 +154,12 @@ def summarize_article(text):
     prompt = (
         "Fasse den folgenden Artikel auf Deutsch in einem kurzen Absatz zusammen. "
         "Fokussiere auf die wichtigsten Informationen, insbesondere wenn es Bezug zu KI hat:\n\n"
-        f"{text[:3000]}"
+        f"{relevance.compress_text(text)}"
     )
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "system", "content": "Du bist ein hilfreicher Assistent, der sicherheitsrelevante Artikel zusammenfasst."},
+        response = llm.chat(
+            task="summarize",
+            messages=[{"role": "system", "content": SYSTEM_PROMPT},
                       {"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=300,
@@ -161,7 +168,7 @@ def summarize_article(text):
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"❌ Fehler bei der Zusammenfassung: {e}")
-        return "Zusammenfassung fehlgeschlagen."
+        return SUMMARY_FAILED
 
 def main_thn():
     print("📡 Starte TheHackerNews Scraper...")
@@ -170,7 +177,12 @@ def main_thn():
     cache_data = load_processed_articles()
     processed_urls = set(cache_data.get("processed_urls", []))
     
-    feed = feedparser.parse(THN_FEED_URL)
+    # Unveränderter Feed (304 oder gleicher Inhalt): nichts zu parsen
+    response = http_client.conditional_get(THN_FEED_URL)
+    if response is None:
+        print("✓ TheHackerNews Feed unverändert seit dem letzten Abruf.")
+        return http_client.NOT_MODIFIED
+    feed = feedparser.parse(response.content)
     cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=72)
     
     print(f"📊 THN Feed enthält {len(feed.entries)} Einträge")
@@ -217,6 +229,7 @@ def main_thn():
     
     if not new_articles:
         print("✓ Alle verfügbaren TheHackerNews Artikel wurden bereits verarbeitet.")
+        http_client.commit_validators(THN_FEED_URL)
         return []
     
     print(f"✓ {len(new_articles)} neue TheHackerNews Artikel zum Verarbeiten gefunden.")
@@ -226,56 +239,98 @@ def main_thn():
     total_articles = len(articles_to_process)
     articles_processed = 0
     
-    for idx, article in enumerate(articles_to_process, 1):
-        print(f"\n📄 Verarbeite Artikel [{idx}/{total_articles}]: {article['title']}")
+    def process(article):
+        print(f"\n📄 Verarbeite Artikel: {article['title']}")
         
         try:
             # HTML-Inhalt des Artikels laden
             try:
-                response = requests.get(article['link'], timeout=10)
+                response = http_client.get(article['link'])
                 soup = BeautifulSoup(response.text, "html.parser")
                 article_body = soup.find('div', {'class': 'post-body'})
                 html_content = str(article_body) if article_body else ""
             except Exception as e:
+                # Nicht als verarbeitet markieren: der nächste Lauf versucht es erneut
                 print(f"⚠️ Fehler beim Laden des Artikels: {e}")
-                html_content = ""
+                return False, None
             
             # Text aus HTML extrahieren
             text = BeautifulSoup(html_content, "html.parser").get_text()
+            if not text.strip():
+                print(f"⚠️ Kein Artikeltext gefunden, wird beim nächsten Lauf erneut versucht.")
+                return False, None
             
-            # Auf KI-Bezug prüfen
-            ai_related, matched_keywords = is_ai_related_with_details(text)
-            if ai_related:
-                print(f"✅ Artikel ist KI-bezogen. Gefundene Keywords: {', '.join(matched_keywords)}")
-            else:
-                print(f"ℹ️ Artikel nicht KI-bezogen, wird trotzdem verarbeitet.")
-            
-            # Artikel zusammenfassen
-            summary = summarize_article(text)
+            # Lokaler Vorfilter statt Zusammenfassung für jeden Artikel
+            decision = prefilter.decide(text, 'thehackernews', article['title'], article['link'],
+                                        extra_keywords=AI_KEYWORDS)
+            if decision == prefilter.SKIP:
+                print(f"⏩ Vorfilter: Artikel nicht KI-bezogen, wird ohne GPT übersprungen.")
+                return True, None
             
-            # Artikel dem Ergebnis hinzufügen
-            articles.append([
-                article['title'],
-                article['link'],
-                summary,
-                article['published'].strftime('%Y-%m-%d')
-            ])
+            # Dieselbe Meldung wird nur einmal zusammengefasst (auch quellenübergreifend)
+            cluster_id, representative = dedup.claim('thehackernews', article['title'], article['link'], text)
+            if not representative:
+                # Erst als verarbeitet markieren, wenn die Meldung eine Zusammenfassung hat
+                if dedup.pending(cluster_id):
+                    print(f"⏳ Meldung wird noch zusammengefasst ({cluster_id}), nächster Lauf prüft erneut.")
+                    return False, None
+                print(f"🔁 Meldung bereits erfasst ({cluster_id}), keine eigene Zusammenfassung.")
+                return True, None
             
-            # URL als verarbeitet markieren
-            processed_urls.add(article['link'])
-            articles_processed += 1
-            
-            # Speichere regelmäßig den Cache
-            if articles_processed % 3 == 0 or idx == total_articles:
-                save_processed_articles(list(processed_urls))
-                
+            # Ohne Zusammenfassung gibt der Artikel die Meldung für andere Quellen wieder frei
+            result = dedup.summarize_claimed(article['link'], summarize_new_article, article, text, decision)
+            # Fehlgeschlagene Artikel nicht als verarbeitet markieren, der nächste Lauf versucht es erneut
+            return result is not None, result
         except Exception as e:
             print(f"❌ Fehler bei der Verarbeitung des Artikels: {e}")
+            return False, None
+    
+    def summarize_new_article(article, text, decision):
+        ai_related, matched_keywords = is_ai_related_with_details(text)
+        if matched_keywords:
+            print(f"✅ Artikel ist KI-bezogen. Gefundene Keywords: {', '.join(matched_keywords)}")
+        
+        # Eindeutig KI-bezogene Artikel: Zusammenfassung, Keywords und Relevanz in einem Aufruf
+        analysis = None
+        if decision == prefilter.DEEP and relevance.COMBINED_ANALYSIS:
+            analysis = relevance.analyze_article(
+                text,
+                "Fasse den Artikel auf Deutsch in einem kurzen Absatz zusammen.",
+                system_prompt=SYSTEM_PROMPT,
+                temperature=0.7
+            )
+        if not analysis or not analysis['summary']:
+            analysis = {'summary': summarize_article(text)}
+        if analysis['summary'] == SUMMARY_FAILED:
+            return None
         
-        time.sleep(1)  # Rate limiting
+        return Article(
+            'thehackernews',
+            article['title'],
+            article['link'],
+            analysis['summary'],
+            pub_date=article['published'].strftime('%Y-%m-%d'),
+            keywords=analysis.get('keywords'),
+            relevance_score=analysis.get('relevance_score')
+        )
+
+    # Alle Artikel gleichzeitig abrufen und zusammenfassen
+    print(f"⚙️ Verarbeite {total_articles} Artikel parallel...")
+    for article, (ok, result) in zip(articles_to_process, llm.run_concurrently(process, articles_to_process)):
+        if not ok:
+            continue
+        # URL als verarbeitet markieren, auch wenn der Vorfilter sie übersprungen hat
+        processed_urls.add(article['link'])
+        if result:
+            articles.append(result)
+            articles_processed += 1
     
     # Abschließendes Speichern des Caches
     save_processed_articles(list(processed_urls))
+    
+    # Feed erst als gesehen markieren, wenn keine neuen Artikel mehr offen sind
+    if len(new_articles) <= MAX_ARTICLES:
+        http_client.commit_validators(THN_FEED_URL)
     print(f"✅ TheHackerNews Scraping abgeschlossen. {articles_processed} Artikel verarbeitet.")
     
     return articles if articles else []
@@ -285,11 +340,10 @@ if __name__ == "__main__":
     result = main_thn()
     if result:
         for r in result:
-            # Array-Format: [title, link, summary, date]
-            print(f"📰 {r[0]}")  # Titel
-            print(f"🔗 {r[1]}")  # Link
-            print(f"📝 {r[2]}")  # Zusammenfassung
-            print(f"📅 {r[3]}")  # Datum
+            print(f"📰 {r.title}")
+            print(f"🔗 {r.link}")
+            print(f"📝 {r.summary}")
+            print(f"📅 {r.date}")
             print("---")
     else:
         print("❌ Keine Artikel gefunden.")
\ No newline at end of file
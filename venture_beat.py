@@ -1,12 +1,13 @@
 import key_manager
-import time
 from datetime import datetime, timezone, timedelta
-import requests
-from openai import OpenAI
+import http_client
+import llm
+import relevance
+import dedup
+from article import Article
 from bs4 import BeautifulSoup
 import re
 
-client = OpenAI(api_key=key_manager.get_openai_key())
 
 VENTUREBEAT_AI_URL = "https://venturebeat.com/category/ai/"
 
@@ -14,7 +15,10 @@ VENTUREBEAT_AI_URL = "https://venturebeat.com/category/ai/"
 now = datetime.now(timezone.utc)
 
 def scrape_article_list(url):
-    response = requests.get(url)
+    """Return the last 24h of articles, or None if the listing is unchanged since the last committed poll"""
+    response = http_client.conditional_get(url)
+    if response is None:
+        return None
     if response.status_code != 200:
         print(f"Fehler beim Abrufen der Seite ({url}): {response.status_code}")
         return []
@@ -70,7 +74,7 @@ def scrape_article_list(url):
 
 def scrape_article_content(article_url):
     try:
-        response = requests.get(article_url)
+        response = http_client.get(article_url)
         if response.status_code != 200:
             print("Fehler beim Abrufen des Artikels:", article_url)
             return ""
@@ -113,10 +117,10 @@ def is_meaningfully_about_ai(text, api_key):
         "Does the following article meaningfully discuss artificial intelligence, "
         "machine learning, or AI-related technology (like LLMs, OpenAI, etc.)? "
         "Answer with only 'Yes' or 'No'.\n\n"
-        f"{text[:3000]}"
+        f"{relevance.compress_text(text, keyword_weighting=False)}"
     )
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = llm.chat(
+        task="classify",
         messages=[{"role": "user", "content": prompt}],
         temperature=0,
         max_tokens=5
@@ -124,21 +128,37 @@ def is_meaningfully_about_ai(text, api_key):
     answer = response.choices[0].message.content.strip().lower()
     return "yes" in answer
 
+SYSTEM_PROMPT = "Du bist ein hilfreicher Assistent, der Artikel prägnant zusammenfasst. Das Ganze bitte auf deutsch."
+
+def analyze_text(article_text):
+    """
+    KI-Check, Relevanz, Keywords und Zusammenfassung in einem einzigen GPT-Aufruf.
+    Gibt die Analyse zurück (is_ai=False bei Nicht-AI-Artikeln) oder None, wenn der Aufruf fehlschlägt.
+    """
+    return relevance.analyze_article(
+        article_text,
+        "Summarize the article concisely in German. Focus on key contributions and methodology.",
+        system_prompt=SYSTEM_PROMPT,
+        temperature=0.7,
+        max_tokens=450
+    )
+
 def summarize_text(article_text):
-    if not is_meaningfully_about_ai(article_text=article_text, api_key=key_manager.get_openai_key()):
+    if not is_meaningfully_about_ai(article_text, key_manager.get_openai_key()):
         print ("GPT sagt: Kein AI-Artikel. Wird übersprungen")
+        return ""
 
     prompt = (
         "Summarize this articl in 3 paragraphs. Focus on key contributions and methodology."
         "Keep in mind to keep the summary concise and only name the most relevant , AI-related information\n\n"
-        f"{article_text}"
+        f"{relevance.compress_text(article_text, budget_tokens=1500)}"
     )
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = llm.chat(
+            task="summarize",
             messages=[
-                {"role": "system", "content": "Du bist ein hilfreicher Assistent, der Artikel prägnant zusammenfasst. Das Ganze bitte auf deutsch."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
@@ -153,31 +173,64 @@ def summarize_text(article_text):
 
 def main_venturebeat():
     articles = scrape_article_list(VENTUREBEAT_AI_URL)
+    if articles is None:
+        print("VentureBeat Übersichtsseite unverändert seit dem letzten Abruf.")
+        return http_client.NOT_MODIFIED
     if not articles:
         print("Keine Artikel in den letzten 24 Stunden gefunden.")
+        http_client.commit_validators(VENTUREBEAT_AI_URL)
         return None
     
-    results = []
-    for art in articles:
+    def process(art):
         print(f"Verarbeite Artikel: {art['title']}")
         content = scrape_article_content(art["link"])
         if not content:
-            print("  Kein Inhalt gefunden, überspringe Artikel.")
-            continue
+            print(f"  Kein Inhalt gefunden, überspringe Artikel: {art['title']}")
+            return None
         
-        summary = summarize_text(content)
-        if not summary:
-            print("  Zusammenfassung fehlgeschlagen, überspringe Artikel.")
-            continue
+        # Dieselbe Meldung wird nur einmal zusammengefasst (auch quellenübergreifend)
+        cluster_id, representative = dedup.claim('venturebeat', art["title"], art["link"], content)
+        if not representative:
+            if dedup.pending(cluster_id):
+                print(f"  Meldung wird noch zusammengefasst ({cluster_id}), nächster Lauf prüft erneut: {art['title']}")
+                return dedup.PENDING
+            print(f"  Meldung bereits erfasst ({cluster_id}), überspringe Artikel: {art['title']}")
+            return None
         
-        results.append({
-            "title": art["title"],
-            "link": art["link"],
-            "pub_date": art["pub_date"],
-            "author": art["author"],
-            "summary": summary
-        })
+        # Ohne Zusammenfassung gibt der Artikel die Meldung für andere Quellen wieder frei
+        return dedup.summarize_claimed(art["link"], summarize_article, art, content)
+    
+    def summarize_article(art, content):
+        if relevance.COMBINED_ANALYSIS:
+            analysis = analyze_text(content)
+            if analysis is None:
+                print(f"  Analyse fehlgeschlagen, fasse einzeln zusammen: {art['title']}")
+                analysis = {'summary': summarize_text(content)}
+            elif not analysis['is_ai']:
+                print(f"  GPT sagt: Kein AI-Artikel, überspringe Artikel: {art['title']}")
+                return None
+        else:
+            analysis = {'summary': summarize_text(content)}
+        if not analysis.get('summary'):
+            print(f"  Keine Zusammenfassung, überspringe Artikel: {art['title']}")
+            return None
         
-        time.sleep(1)
+        return Article(
+            'venturebeat',
+            art["title"],
+            art["link"],
+            analysis['summary'],
+            pub_date=art["pub_date"],
+            authors=art["author"],
+            keywords=analysis.get('keywords'),
+            relevance_score=analysis.get('relevance_score')
+        )
+    
+    # Artikel gleichzeitig laden und zusammenfassen
+    results = llm.run_concurrently(process, articles)
     
+    # Offene Duplikate: Validatoren nicht übernehmen, damit der nächste Lauf die Liste erneut verarbeitet
+    if not any(result is dedup.PENDING for result in results):
+        http_client.commit_validators(VENTUREBEAT_AI_URL)
+    results = [result for result in results if result and result is not dedup.PENDING]
     return results if results else None
\ No newline at end of file
@@ -23,15 +23,15 @@ logging.basicConfig(
 logger = logging.getLogger('ai_research_hub')
 
 # Import your existing modules - modified to work with .env
-import arxiv_scraper
-import techcrunch
-import venture_beat
-import stanford_ai
-import theverge
-import thn
 import db_manager
 import relevance
-from openai import OpenAI
+import prefilter
+import ingestion
+import dedup
+import providers
+import llm
+import llm_metrics
+from article import to_dicts
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -39,9 +39,6 @@ CORS(app)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', os.urandom(24))  # For session management
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
 
-# OpenAI client for chat functionality
-client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
-
 # Setup database
 db_path = os.environ.get('DB_PATH', 'research_data.db')
 db_manager.init_db(db_path)
@@ -80,22 +77,21 @@ def dashboard():
         
         for article in recent_articles:
             # Process keywords
-            article_keywords = json.loads(article.get('keywords', '[]'))
-            for kw in article_keywords:
+            for kw in article.keywords:
                 if kw in keywords:
                     keywords[kw] += 1
                 else:
                     keywords[kw] = 1
             
             # Process sources
-            source = article.get('source')
+            source = article.source
             if source in sources:
                 sources[source] += 1
             else:
                 sources[source] = 1
             
             # Process dates
-            date_str = article.get('pub_date', '')[:10]  # Get only YYYY-MM-DD part
+            date_str = article.date  # Get only YYYY-MM-DD part
             if date_str:
                 if date_str in dates:
                     dates[date_str] += 1
@@ -126,7 +122,7 @@ def dashboard():
         }
         
         return render_template('dashboard.html', 
-                            articles=recent_articles[:20],  # Show only 20 most recent
+                            articles=dedup.add_related(to_dicts(recent_articles[:20])),  # Show only 20 most recent
                             chart_data=chart_data)
     except Exception as e:
         logger.error(f"Error in dashboard route: {str(e)}", exc_info=True)
@@ -142,10 +138,7 @@ def sources():
         # Group by source
         articles_by_source = {}
         for article in recent_articles:
-            source = article.get('source')
-            if source not in articles_by_source:
-                articles_by_source[source] = []
-            articles_by_source[source].append(article)
+            articles_by_source.setdefault(article.source, []).append(article.to_dict())
         
         return render_template('sources.html', 
                             articles_by_source=articles_by_source,
@@ -211,73 +204,42 @@ def api_fetch_articles():
         if not citation_styles:
             citation_styles = ["apa"]
         
-        results = {}
-        
-        # Fetch articles from selected sources
-        if 'arxiv' in sources:
-            results['arxiv'] = arxiv_scraper.main_arxiv(
-                categories=[arxiv_category],
-                max_results=max_articles,
-                citation_styles=citation_styles
-            )
-            # Save to database
-            if results['arxiv']:
-                for title, data in results['arxiv'].items():
-                    # Format data for database
-                    db_data = {
-                        'title': title,
-                        'link': data['link'],
-                        'summary': data['summary'],
-                        'pub_date': data['published'],
-                        'content': data['summary'],
-                        'keywords': relevance.extract_keywords(data['summary']),
-                        'relevance_score': relevance.analyze_relevance(data['summary'])
-                    }
-                    db_manager.save_article('arxiv', db_data)
-        
-        if 'techcrunch' in sources:
-            results['techcrunch'] = techcrunch.main_techcrunch()
-            if results['techcrunch']:
-                db_manager.save_batch('techcrunch', results['techcrunch'])
-        
-        if 'venturebeat' in sources:
-            results['venturebeat'] = venture_beat.main_venturebeat()
-            if results['venturebeat']:
-                db_manager.save_batch('venturebeat', results['venturebeat'])
-        
-        if 'stanford' in sources:
-            stanford_results = stanford_ai.main_stanford()
-            if stanford_results:
-                results['stanford'] = stanford_results
-                # Convert to proper format for database
-                for title, link, summary in stanford_results:
-                    db_data = {
-                        'title': title,
-                        'link': link,
-                        'summary': summary,
-                        'pub_date': datetime.now().strftime('%Y-%m-%d'),
-                        'keywords': relevance.extract_keywords(summary),
-                        'relevance_score': relevance.analyze_relevance(summary)
-                    }
-                    db_manager.save_article('stanford', db_data)
-        
-        if 'theverge' in sources:
-            results['theverge'] = theverge.main_verge()
-            if results['theverge']:
-                db_manager.save_batch('theverge', results['theverge'])
-        
-        if 'thehackernews' in sources:
-            results['thehackernews'] = thn.main_thn()
-            if results['thehackernews']:
-                db_manager.save_batch('thehackernews', results['thehackernews'])
+        # Fetch articles from all selected sources concurrently
+        run_results = ingestion.run_sources(sources, {
+            'arxiv_categories': [arxiv_category],
+            'max_results': max_articles,
+            'citation_styles': citation_styles
+        })
+        results = {name: result['data'] or [] for name, result in run_results.items()}
+        
+        # Keywords and relevance for research sources (relevance calls run concurrently);
+        # articles already scored by the combined analysis call are not sent again
+        research_articles = results.get('arxiv', []) + results.get('stanford', [])
+        unscored = [a for a in research_articles if not a.relevance_score]
+        scores = llm.run_concurrently(lambda a: relevance.analyze_relevance(a.summary), unscored)
+        for article, score in zip(unscored, scores):
+            article.relevance_score = score
+        for article in research_articles:
+            if not article.keywords:
+                article.keywords = relevance.extract_keywords(article.summary)
+            if not article.pub_date:
+                article.pub_date = datetime.now().strftime('%Y-%m-%d')
+        
+        # Save to database in one batch
+        db_manager.save_articles([article for articles in results.values() for article in articles])
+        
+        for name, result in run_results.items():
+            if result['error']:
+                logger.error(f"Error fetching {name} articles: {result['error']}")
         
         # Store results in session for later use
-        session['results'] = results
+        session['results'] = {name: to_dicts(articles) for name, articles in results.items()}
         
         return jsonify({
             'success': True,
             'message': 'Articles fetched successfully',
-            'redirect': url_for('sources')
+            'redirect': url_for('sources'),
+            'sourceStatus': ingestion.summarize_results(run_results)
         })
     
     except Exception as e:
@@ -315,8 +277,8 @@ def api_chat():
         
         # Simple relevance filtering - in production, use a more sophisticated approach
         for article in recent_articles:
-            if (user_query.lower() in article.get('title', '').lower() or 
-                user_query.lower() in article.get('summary', '').lower()):
+            if (user_query.lower() in article.title.lower() or 
+                user_query.lower() in article.summary.lower()):
                 relevant_articles.append(article)
         
         # If no direct matches, include some recent articles for context
@@ -330,9 +292,9 @@ def api_chat():
         # Build context for AI
         context = "Available information:\n\n"
         for article in relevant_articles[:5]:  # Limit to 5 articles for context
-            context += f"- {article.get('title')}\n"
-            context += f"  Source: {article.get('source')}\n"
-            context += f"  Summary: {article.get('summary', '')[:300]}...\n\n"
+            context += f"- {article.title}\n"
+            context += f"  Source: {article.source}\n"
+            context += f"  Summary: {article.summary[:300]}...\n\n"
         
         # Prepare prompt for OpenAI
         system_prompt = (
@@ -350,8 +312,8 @@ def api_chat():
             }), 400
         
         try:
-            response = client.chat.completions.create(
-                model=os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo'),
+            response = llm.chat(
+                task='chat',
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"Here is information from various AI research and news sources:\n\n{context}\n\nUser question: {user_query}"}
@@ -437,10 +399,9 @@ def api_update_settings():
         # Reload environment variables
         dotenv.load_dotenv(override=True)
         
-        # If API key was updated, update the client
+        # If API key was updated, rebuild the client on next use
         if api_key:
-            global client
-            client = OpenAI(api_key=api_key)
+            providers.reset('openai')
         
         return jsonify({
             'success': True,
@@ -480,18 +441,18 @@ def api_export():
         if export_format == 'json':
             # Convert articles to JSON
             with open(export_path, 'w') as f:
-                json.dump(articles, f, indent=2)
+                json.dump(to_dicts(articles), f, indent=2)
         else:
             # Default to text export
             with open(export_path, 'w') as f:
                 f.write(f"AI Research Summary - {date_str}\n\n")
                 
                 for article in articles:
-                    f.write(f"Title: {article.get('title')}\n")
-                    f.write(f"Source: {article.get('source')}\n")
-                    f.write(f"Date: {article.get('pub_date')}\n")
-                    f.write(f"Link: {article.get('link')}\n")
-                    f.write(f"Summary: {article.get('summary')}\n\n")
+                    f.write(f"Title: {article.title}\n")
+                    f.write(f"Source: {article.source}\n")
+                    f.write(f"Date: {article.pub_date}\n")
+                    f.write(f"Link: {article.link}\n")
+                    f.write(f"Summary: {article.summary}\n\n")
                     f.write("-" * 80 + "\n\n")
         
         # Signal success and provide download link
@@ -530,7 +491,7 @@ def get_data():
         
         # Format data for frontend
         data = {
-            'articles': recent_articles,
+            'articles': dedup.add_related(to_dicts(recent_articles)),
             'meta': {
                 'total': len(recent_articles),
                 'last_updated': datetime.now().isoformat()
@@ -545,6 +506,29 @@ def get_data():
             'message': f'Error retrieving data: {str(e)}'
         }), 500
 
+@app.route('/api/llm_metrics')
+def get_llm_metrics():
+    """API endpoint with token, cost and latency aggregates of the LLM calls"""
+    try:
+        group_by = request.args.get('group_by', 'source')
+        hours = request.args.get('hours', type=float)
+        return jsonify({
+            'success': True,
+            'group_by': group_by,
+            'aggregates': llm_metrics.get_aggregates(group_by, hours),
+            'runtime': llm.get_stats(),
+            'compression': relevance.get_compression_stats(),
+            'prefilter': prefilter.get_stats()
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"LLM metrics error: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'message': f'Error retrieving LLM metrics: {str(e)}'
+        }), 500
+
 @app.route('/api/fetch_data', methods=['POST'])
 def fetch_data():
     """API endpoint to fetch data based on selected sources and settings"""
@@ -562,67 +546,13 @@ def fetch_data():
                 'message': 'No sources selected.'
             }), 400
 
-        # Placeholder for fetched data
-        fetched_data = {}
-
-        # Fetch data from each selected source
-        if 'arxiv' in sources:
-            try:
-                fetched_data['arxiv'] = arxiv_scraper.main_arxiv(categories=[arxiv_category], max_results=max_articles, citation_styles=citation_styles)
-                logger.info(f"ArXiv data structure: {type(fetched_data['arxiv'])}")
-            except Exception as e:
-                logger.error(f"Error fetching ArXiv data: {str(e)}")
-                fetched_data['arxiv'] = {}
-
-        if 'techcrunch' in sources:
-            try:
-                tech_results = techcrunch.main_techcrunch()
-                if tech_results:
-                    fetched_data['techcrunch'] = tech_results[:max_articles]
-                logger.info(f"TechCrunch data structure: {type(fetched_data['techcrunch'])}")
-            except Exception as e:
-                logger.error(f"Error fetching TechCrunch data: {str(e)}")
-                fetched_data['techcrunch'] = []
-
-        if 'venturebeat' in sources:
-            try:
-                vb_results = venture_beat.main_venturebeat()
-                if vb_results:
-                    fetched_data['venturebeat'] = vb_results[:max_articles]
-                logger.info(f"VentureBeat data structure: {type(fetched_data['venturebeat'])}")
-            except Exception as e:
-                logger.error(f"Error fetching VentureBeat data: {str(e)}")
-                fetched_data['venturebeat'] = []
-
-        if 'stanford' in sources:
-            try:
-                stanford_results = stanford_ai.main_stanford()
-                if stanford_results:
-                    fetched_data['stanford'] = stanford_results[:max_articles]
-                logger.info(f"Stanford data structure: {type(fetched_data['stanford'])}")
-            except Exception as e:
-                logger.error(f"Error fetching Stanford AI data: {str(e)}")
-                fetched_data['stanford'] = []
-
-        if 'theverge' in sources:
-            try:
-                verge_results = theverge.main_verge()
-                if verge_results:
-                    fetched_data['theverge'] = verge_results[:max_articles]
-                logger.info(f"TheVerge data structure: {type(fetched_data['theverge'])}")
-            except Exception as e:
-                logger.error(f"Error fetching The Verge data: {str(e)}")
-                fetched_data['theverge'] = []
-
-        if 'thehackernews' in sources:
-            try:
-                thn_results = thn.main_thn()
-                if thn_results:
-                    fetched_data['thehackernews'] = thn_results[:max_articles]
-                logger.info(f"THN data structure: {type(fetched_data['thehackernews'])}")
-            except Exception as e:
-                logger.error(f"Error fetching THN data: {str(e)}")
-                fetched_data['thehackernews'] = []
+        # Fetch data from all selected sources concurrently
+        results = ingestion.run_sources(sources, {
+            'arxiv_categories': [arxiv_category],
+            'max_results': max_articles,
+            'citation_styles': citation_styles
+        })
+        fetched_data = {name: to_dicts(articles) for name, articles in ingestion.collect_data(results).items()}
 
         # Log the fetched data for debugging
         logger.info(f"Fetched data: {json.dumps(fetched_data, indent=2)}")
@@ -630,7 +560,8 @@ def fetch_data():
         # Return the fetched data
         return jsonify({
             'success': True,
-            'data': fetched_data
+            'data': fetched_data,
+            'sourceStatus': ingestion.summarize_results(results)
         })
 
     except Exception as e:
@@ -646,87 +577,26 @@ def dashboard_data():
     try:
         # Load selected sources from request
         data = request.get_json() or {}
-        sources = data.get('sources', ['arxiv', 'techcrunch', 'theverge', 'thehackernews', 'venturebeat', 'stanford'])
+        sources = data.get('sources', ingestion.SOURCE_NAMES)
         max_results = 5
         
-        # Fetch live data from scrapers
-        all_data = {}
-        if 'arxiv' in sources:
-            try:
-                all_data['arxiv'] = arxiv_scraper.main_arxiv(categories=['cs.AI', 'cs.LG'], max_results=max_results)
-            except Exception as e:
-                logger.error(f"Error fetching ArXiv data: {e}")
-                all_data['arxiv'] = {}
-        if 'techcrunch' in sources:
-            try:
-                all_data['techcrunch'] = techcrunch.main_techcrunch()[:max_results]
-            except Exception as e:
-                logger.error(f"Error fetching TechCrunch data: {e}")
-                all_data['techcrunch'] = []
-        if 'venturebeat' in sources:
-            try:
-                all_data['venturebeat'] = venture_beat.main_venturebeat()[:max_results]
-            except Exception as e:
-                logger.error(f"Error fetching VentureBeat data: {e}")
-                all_data['venturebeat'] = []
-        if 'theverge' in sources:
-            try:
-                all_data['theverge'] = theverge.main_verge()[:max_results]
-            except Exception as e:
-                logger.error(f"Error fetching The Verge data: {e}")
-                all_data['theverge'] = []
-        if 'thehackernews' in sources:
-            try:
-                all_data['thehackernews'] = thn.main_thn()[:max_results]
-            except Exception as e:
-                logger.error(f"Error fetching THN data: {e}")
-                all_data['thehackernews'] = []
-        if 'stanford' in sources:
-            try:
-                all_data['stanford'] = stanford_ai.main_stanford()[:max_results]
-            except Exception as e:
-                logger.error(f"Error fetching Stanford AI data: {e}")
-                all_data['stanford'] = []
-        
-        # Build flattened recentArticles list
-        recent_articles = []
-        # ArXiv returns dict of title->info
-        if 'arxiv' in all_data:
-            for title, info in all_data['arxiv'].items():
-                recent_articles.append({
-                    'title': title,
-                    'summary': info.get('summary', ''),
-                    'source': 'arxiv',
-                    'url': info.get('link', '#'),
-                    'date': info.get('published', ''),
-                    'relevance': 0
-                })
-        # Other sources return list of [title, link, summary]
-        for src in ['techcrunch', 'venturebeat', 'theverge', 'thehackernews', 'stanford']:
-            for art in all_data.get(src, []):
-                title = art[0] if len(art) > 0 else ''
-                url = art[1] if len(art) > 1 else '#'
-                summary = art[2] if len(art) > 2 else ''
-                date = art[3] if len(art) > 3 else ''
-                recent_articles.append({
-                    'title': title,
-                    'summary': summary,
-                    'source': src,
-                    'url': url,
-                    'date': date,
-                    'relevance': 0
-                })
+        # Fetch live data from scrapers concurrently
+        results = ingestion.run_sources(sources, {
+            'arxiv_categories': ['cs.AI', 'cs.LG'],
+            'max_results': max_results
+        })
+        all_data = ingestion.collect_data(results)
         
         # Sort and limit articles
-        recent_articles = sorted(recent_articles, key=lambda x: x['date'], reverse=True)[:20]
+        articles = [article for articles in all_data.values() for article in articles]
+        articles = sorted(articles, key=lambda a: a.date, reverse=True)[:20]
         
         # Extract keywords and sourceStats
         keyword_counts = {}
         source_counts = {}
-        for art in recent_articles:
-            src = art['source']
-            source_counts[src] = source_counts.get(src, 0) + 1
-            for word in (art['summary'] or art['title']).split():
+        for art in articles:
+            source_counts[art.source] = source_counts.get(art.source, 0) + 1
+            for word in (art.summary or art.title).split():
                 w = word.strip(',.').lower()
                 if len(w) > 3:
                     keyword_counts[w] = keyword_counts.get(w, 0) + 1
@@ -734,6 +604,11 @@ def dashboard_data():
         # Prepare responses
         top_keywords = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:10]
         trending = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:7]
+        recent_articles = dedup.add_related([
+            {'title': a.title, 'summary': a.summary, 'source': a.source,
+             'url': a.link or '#', 'date': a.date, 'relevance': a.relevance_score}
+            for a in articles
+        ], 'url')
         response = {
             'recentArticles': recent_articles,
             'topKeywords': [{'term': k, 'count': v} for k, v in top_keywords],